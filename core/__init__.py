@@ -1,3 +1,8 @@
 from .image_processor import ImageProcessor
+from .pipeline import PointPipeline
+from .raw_reader import RawImageReader
+from .resize_engine import PlanCache, ResamplingPlan
+from .stats import ImageStats, image_stats
 
-__all__ = ['ImageProcessor']
\ No newline at end of file
+__all__ = ['ImageProcessor', 'PointPipeline', 'PlanCache', 'ResamplingPlan',
+           'RawImageReader', 'ImageStats', 'image_stats']
\ No newline at end of file
@@ -0,0 +1,19 @@
+import numpy as np
+
+
+def decode_gray(filepath, target_size=None):
+    """
+    將壓縮影像直接解碼為灰階 uint8 陣列。
+    target_size=(width, height) 時，JPEG 會啟用 draft 模式在 DCT 域以 1/2、1/4、1/8
+    縮小解碼，輸出不小於目標大小，之後再交給縮放運算；其他格式照常完整解碼。
+    回傳值以 np.asarray 取得，不再多複製一次，因此為唯讀陣列。
+    """
+    from PIL import Image
+
+    with Image.open(filepath) as img:
+        if target_size is not None and img.format == 'JPEG':
+            # 同時指定 'L'，解碼器只輸出亮度通道，省去色彩轉換
+            img.draft('L', tuple(target_size))
+        if img.mode != 'L':
+            img = img.convert('L')
+        return np.asarray(img)
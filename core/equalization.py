@@ -0,0 +1,150 @@
+from functools import lru_cache
+
+import numpy as np
+
+from .lut import apply_lut
+
+
+def _check_uint8(img):
+    if img.dtype != np.uint8:
+        raise TypeError(f"直方圖等化只支援 uint8 影像，收到 {img.dtype}")
+
+
+def _batched_histograms(groups):
+    """groups: (G, P) uint8，一次 bincount 得到 G 組 256 階直方圖"""
+    n_groups = groups.shape[0]
+    offsets = (np.arange(n_groups, dtype=np.int32) * 256)[:, None]
+    index = groups.astype(np.int32) + offsets
+    counts = np.bincount(index.ravel(), minlength=n_groups * 256)
+    return counts.reshape(n_groups, 256), index
+
+
+def _cdf_luts(hist, total):
+    """由直方圖計算等化 LUT：cdf 正規化到 [0, 255] 後四捨五入"""
+    cdf = np.cumsum(hist, axis=-1, dtype=np.float64)
+    cdf_min = np.take_along_axis(cdf, np.argmax(hist > 0, axis=-1)[..., None], axis=-1)
+    denom = np.maximum(total - cdf_min, 1)
+    luts = np.floor((cdf - cdf_min) / denom * 255 + 0.5)
+    # 單一灰階的影像維持原值
+    flat = (total - cdf_min) == 0
+    luts = np.where(flat, np.arange(256), luts)
+    return np.clip(luts, 0, 255).astype(np.uint8)
+
+
+def histogram_equalization(img):
+    """全域直方圖等化；(N, H, W) 堆疊每張各自等化，一次 bincount 與一次查表完成"""
+    _check_uint8(img)
+    if img.ndim == 2:
+        # 單張影像不需要各組的偏移索引，直接 bincount 後查表
+        hist = np.bincount(img.ravel(), minlength=256)
+        return apply_lut(_cdf_luts(hist, img.size), img)
+    frames = img.reshape((-1, img.shape[-2] * img.shape[-1]))
+    hist, index = _batched_histograms(frames)
+    luts = _cdf_luts(hist, frames.shape[1])
+    return np.take(luts.ravel(), index).reshape(img.shape)
+
+
+@lru_cache(maxsize=32)
+def _tile_offsets(height, width, tile_h, tile_w, grid_x):
+    """每個像素所屬 tile 的直方圖起始位置 (tile 編號 * 256)，依影像大小與 tile 設定快取"""
+    ty = np.arange(height) // tile_h
+    tx = np.arange(width) // tile_w
+    offsets = (ty[:, None] * grid_x + tx[None, :]) * 256
+    offsets.flags.writeable = False
+    return offsets
+
+
+def _tile_luts(frames, tile_grid, clip_limit):
+    """計算每個 tile 的剪裁直方圖 LUT，回傳 (N, ty, tx, 256) 與 tile 大小"""
+    n, height, width = frames.shape
+    grid_y, grid_x = tile_grid
+    tile_h = -(-height // grid_y)
+    tile_w = -(-width // grid_x)
+
+    # 尺寸無法整除時以鏡像補齊
+    pad_y = tile_h * grid_y - height
+    pad_x = tile_w * grid_x - width
+    if pad_y or pad_x:
+        frames = np.pad(frames, ((0, 0), (0, pad_y), (0, pad_x)), mode='symmetric')
+
+    # 每個像素加上所屬 tile（與所屬影像）的偏移，一次 bincount 得到所有 tile 的直方圖
+    n_tiles = n * grid_y * grid_x
+    index = frames.astype(np.intp)
+    index += _tile_offsets(frames.shape[1], frames.shape[2], tile_h, tile_w, grid_x)
+    if n > 1:
+        index += (np.arange(n) * (grid_y * grid_x * 256))[:, None, None]
+    hist = np.bincount(index.ravel(), minlength=n_tiles * 256).reshape(n_tiles, 256)
+
+    tile_pixels = tile_h * tile_w
+    if clip_limit > 0:
+        # 剪掉超過上限的計數並平均分回所有灰階
+        limit = max(1.0, clip_limit * tile_pixels / 256)
+        hist = hist.astype(np.float64)
+        excess = np.maximum(hist - limit, 0).sum(axis=-1, keepdims=True)
+        hist = np.minimum(hist, limit) + excess / 256
+
+    cdf = np.cumsum(hist, axis=-1, dtype=np.float64)
+    luts = np.clip(np.floor(cdf * (255 / tile_pixels) + 0.5), 0, 255).astype(np.uint8)
+    return luts.reshape(n, grid_y, grid_x, 256), tile_h, tile_w
+
+
+def _interp_axis(length, tile_size, grid):
+    """每個像素相對於相鄰兩個 tile 中心的索引與權重"""
+    pos = (np.arange(length) + 0.5) / tile_size - 0.5
+    lo = np.floor(pos).astype(np.intp)
+    weight = (pos - lo).astype(np.float32)
+    # 邊界外側只使用最近的 tile
+    weight[lo < 0] = 0
+    weight[lo >= grid - 1] = 0
+    lo = np.clip(lo, 0, grid - 1)
+    hi = np.minimum(lo + 1, grid - 1)
+    return lo, hi, weight
+
+
+@lru_cache(maxsize=32)
+def _neighbor_offsets(height, width, tile_h, tile_w, grid_y, grid_x):
+    """
+    每個像素相鄰四個 tile 的 LUT 在攤平後 (ty, tx, 256) 陣列中的起始位置，
+    以及列/行方向的內插權重；依影像大小與 tile 設定快取
+    """
+    y0, y1, wy = _interp_axis(height, tile_h, grid_y)
+    x0, x1, wx = _interp_axis(width, tile_w, grid_x)
+    bases = tuple((ty[:, None] * grid_x + tx[None, :]) * 256
+                  for ty in (y0, y1) for tx in (x0, x1))
+    for array in bases + (wy, wx):
+        array.flags.writeable = False
+    return bases, wy[:, None], wx[None, :]
+
+
+def clahe(img, clip_limit=2.0, tile_grid=(8, 8)):
+    """
+    限制對比度自適應直方圖等化 (CLAHE)：每個 tile 各自建 LUT，
+    像素值再由相鄰四個 tile 的 LUT 結果雙線性內插。支援 (N, H, W) 堆疊。
+    """
+    _check_uint8(img)
+    height, width = img.shape[-2:]
+    frames = img.reshape((-1, height, width))
+    # tile 數不可多於像素數
+    grid_y, grid_x = min(tile_grid[0], height), min(tile_grid[1], width)
+    luts, tile_h, tile_w = _tile_luts(frames, (grid_y, grid_x), clip_limit)
+
+    bases, wy, wx = _neighbor_offsets(height, width, tile_h, tile_w, grid_y, grid_x)
+
+    # 查表位置 = tile 起始位置 + 灰階值（堆疊再加上每張的 LUT 偏移），一次 np.take 取值
+    index = frames.astype(np.intp)
+    if frames.shape[0] > 1:
+        index += (np.arange(frames.shape[0]) * (grid_y * grid_x * 256))[:, None, None]
+    flat = luts.ravel()
+    position = np.empty_like(index)
+    v00, v01, v10, v11 = (np.take(flat, np.add(base, index, out=position)) for base in bases)
+
+    # 與 (1-wx)*v00 + wx*v01 等式子相同的運算順序，只是重複使用緩衝
+    value = (1 - wx) * v00
+    tmp = np.multiply(wx, v01)
+    value += tmp
+    bottom = np.multiply(1 - wx, v10)
+    bottom += np.multiply(wx, v11, out=tmp)
+    value *= 1 - wy
+    value += np.multiply(wy, bottom, out=bottom)
+    value += 0.5
+    return value.astype(np.uint8).reshape(img.shape)
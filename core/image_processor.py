@@ -1,112 +1,178 @@
 import numpy as np
-from PIL import Image
-import matplotlib.pyplot as plt
 from pathlib import Path
 
+from .decode import decode_gray
+from .equalization import clahe, histogram_equalization
+from .lut import apply_lut, gamma_lut, log_lut
+from .parallel import RowParallelExecutor
+from .pipeline import PointPipeline
+from .raw_reader import RawImageReader
+from .resize_engine import PlanCache, ResizeEngine
+from .tiled import tiled_resize
+
 class ImageProcessor:
-    def __init__(self, data_path="data"):
+    def __init__(self, data_path="data", plan_cache_size=32, threads=1):
         self.data_path = Path(data_path)
+        self.plan_cache = PlanCache(plan_cache_size)
+        # threads > 1 時縮放與查表運算會依列分帶交給執行緒池；None 表示使用全部核心
+        self.executor = RowParallelExecutor(threads)
+        self.resize_engine = ResizeEngine(self.plan_cache, self.executor)
 
     # Part A: Image Reading
-    def read_raw_image(self, filename, width=512, height=512):
-        """讀取RAW格式影像"""
-        file_path = self.data_path / filename if not Path(filename).is_absolute() else Path(filename)
+    def resolve_path(self, filename):
+        """將檔名解析成實際路徑"""
+        path = Path(filename)
+        if path.is_absolute():
+            return path
+        # 相對路徑優先找 data_path 底下，找不到時視為相對於目前目錄
+        candidate = self.data_path / path
+        return candidate if candidate.exists() or not path.exists() else path
+
+    def read_raw_image(self, filename, width=512, height=512, offset=0, mmap=False):
+        """讀取RAW格式影像；mmap=True 時回傳記憶體映射的零複製視圖"""
+        file_path = self.resolve_path(filename)
+        if mmap:
+            return RawImageReader(file_path, width, height, offset=offset).frame(0)
         with open(file_path, 'rb') as f:
+            f.seek(offset)
             raw_data = f.read()
         img = np.frombuffer(raw_data, dtype=np.uint8)
         img = img.reshape((height, width))
         return img
 
-    def read_jpg_image(self, filename):
-        """讀取JPG/BMP格式影像"""
-        file_path = self.data_path / filename if not Path(filename).is_absolute() else Path(filename)
-        img = Image.open(file_path).convert('L')
-        img = np.array(img)
-        return img
-
-    def read_image(self, filename, width=512, height=512):
+    def read_jpg_image(self, filename, target_size=None):
+        """讀取JPG/BMP格式影像；target_size=(width, height) 時 JPEG 以縮小解碼讀入"""
+        return decode_gray(self.resolve_path(filename), target_size)
+
+    def open_raw(self, filename, width=512, height=512, dtype=np.uint8, offset=0, stride=None,
+                 byteorder='<'):
+        """開啟RAW檔的記憶體映射讀取器，可逐張或逐區域存取"""
+        return RawImageReader(self.resolve_path(filename), width, height, dtype, offset, stride,
+                              byteorder)
+
+    def iter_raw_frames(self, filename, width=512, height=512, dtype=np.uint8, offset=0,
+                        stride=None, byteorder='<'):
+        """逐張讀取多張串接的RAW影像（generator）"""
+        reader = self.open_raw(filename, width, height, dtype, offset, stride, byteorder)
+        yield from reader.iter_frames()
+
+    def read_raw_region(self, filename, y, x, region_height, region_width,
+                        width=512, height=512, offset=0):
+        """只讀取RAW影像的指定區域"""
+        reader = self.open_raw(filename, width, height, offset=offset)
+        return reader.region(y, x, region_height, region_width)
+
+    def read_image(self, filename, width=512, height=512, target_size=None):
         """統一的影像讀取介面"""
         if filename.endswith('.raw'):
             return self.read_raw_image(filename, width, height)
         else:
-            return self.read_jpg_image(filename)
+            return self.read_jpg_image(filename, target_size)
+
+    def read_resized(self, filename, new_width, new_height, method='bilinear',
+                     width=512, height=512):
+        """讀取並縮放到指定大小；JPEG 先縮小解碼，只剩較小的影像需要重取樣"""
+        img = self.read_image(filename, width, height, target_size=(new_width, new_height))
+        if img.shape == (new_height, new_width):
+            return img
+        return self.resize(img, new_width, new_height, method)
 
     def get_center_pixels(self, img, size=10):
-        """取得影像中心10x10像素值"""
-        h, w = img.shape
+        """取得影像中心10x10像素值；(N, H, W) 堆疊會取每張的中心"""
+        h, w = img.shape[-2:]
         center_y, center_x = h // 2, w // 2
         start_y = center_y - size // 2
         start_x = center_x - size // 2
-        center_pixels = img[start_y:start_y+size, start_x:start_x+size]
+        center_pixels = img[..., start_y:start_y+size, start_x:start_x+size]
         return center_pixels
 
     # Part B: Image Enhancement Toolkit
-    def log_transform(self, img):
-        """對數轉換"""
+    def log_transform(self, img, out=None):
+        """對數轉換；(N, H, W) 堆疊依每張影像各自的最大值正規化"""
+        if img.dtype == np.uint8:
+            if img.ndim == 2:
+                return apply_lut(log_lut(int(img.max())), img, out, self.executor)
+            return self._log_transform_stack(img, out)
         img_normalized = img / 255.0
         c = 1.0
         log_img = c * np.log(1 + img_normalized)
-        log_img = (log_img / log_img.max() * 255).astype(np.uint8)
+        log_img = (log_img / log_img.max(axis=(-2, -1), keepdims=True) * 255).astype(np.uint8)
         return log_img
 
-    def gamma_transform(self, img, gamma=1.0):
-        """Gamma轉換"""
+    def _log_transform_stack(self, img, out=None):
+        """將最大值相同的影像分成一組，每組只需一次查表"""
+        maxes = img.max(axis=(-2, -1))
+        if out is None:
+            out = np.empty(img.shape, dtype=np.uint8)
+        elif out.shape != img.shape:
+            raise ValueError(f"輸出大小 {out.shape} 與影像 {img.shape} 不符")
+        unique = np.unique(maxes)
+        if unique.size == 1:
+            return apply_lut(log_lut(int(unique[0])), img, out, self.executor)
+        for max_value in unique:
+            mask = maxes == max_value
+            out[mask] = apply_lut(log_lut(int(max_value)), img[mask])
+        return out
+
+    def gamma_transform(self, img, gamma=1.0, out=None):
+        """Gamma轉換；uint8 影像可指定 out 寫入預先配置的陣列"""
+        if img.dtype == np.uint8:
+            return apply_lut(gamma_lut(gamma), img, out, self.executor)
         img_normalized = img / 255.0
         gamma_img = np.power(img_normalized, gamma)
         gamma_img = (gamma_img * 255).astype(np.uint8)
         return gamma_img
 
-    def image_negative(self, img):
+    def image_negative(self, img, out=None):
         """影像負片"""
+        if out is not None:
+            return np.subtract(255, img, out=out)
         return 255 - img
 
-    # Part C: Image Downsampling and Upsampling
-    def nearest_neighbor_resize(self, img, new_width, new_height):
-        """最近鄰插值法調整影像大小"""
-        old_height, old_width = img.shape
-        new_img = np.zeros((new_height, new_width), dtype=np.uint8)
-
-        scale_x = old_width / new_width
-        scale_y = old_height / new_height
-
-        for i in range(new_height):
-            for j in range(new_width):
-                src_x = int(j * scale_x)
-                src_y = int(i * scale_y)
-
-                src_x = min(src_x, old_width - 1)
-                src_y = min(src_y, old_height - 1)
+    def histogram_equalization(self, img):
+        """全域直方圖等化"""
+        return histogram_equalization(img)
 
-                new_img[i, j] = img[src_y, src_x]
+    def clahe(self, img, clip_limit=2.0, tile_grid=(8, 8)):
+        """限制對比度自適應直方圖等化 (CLAHE)"""
+        return clahe(img, clip_limit, tile_grid)
 
-        return new_img
+    def pipeline(self):
+        """建立可串接的點運算管線，例如 processor.pipeline().gamma(0.5).negative()"""
+        return PointPipeline(self)
 
-    def bilinear_resize(self, img, new_width, new_height):
-        """雙線性插值法調整影像大小"""
-        old_height, old_width = img.shape
-        new_img = np.zeros((new_height, new_width), dtype=np.uint8)
-
-        scale_x = (old_width - 1) / (new_width - 1) if new_width > 1 else 0
-        scale_y = (old_height - 1) / (new_height - 1) if new_height > 1 else 0
-
-        for i in range(new_height):
-            for j in range(new_width):
-                src_x = j * scale_x
-                src_y = i * scale_y
-
-                x1 = int(np.floor(src_x))
-                x2 = min(x1 + 1, old_width - 1)
-                y1 = int(np.floor(src_y))
-                y2 = min(y1 + 1, old_height - 1)
-
-                dx = src_x - x1
-                dy = src_y - y1
-
-                value = (1 - dx) * (1 - dy) * img[y1, x1] + \
-                        dx * (1 - dy) * img[y1, x2] + \
-                        (1 - dx) * dy * img[y2, x1] + \
-                        dx * dy * img[y2, x2]
-
-                new_img[i, j] = int(value)
-
-        return new_img
\ No newline at end of file
+    # Part C: Image Downsampling and Upsampling
+    def nearest_neighbor_resize(self, img, new_width, new_height, out=None):
+        """最近鄰插值法調整影像大小；out 為預先配置的輸出陣列"""
+        return self.resize_engine.nearest(img, new_width, new_height, out)
+
+    def bilinear_resize(self, img, new_width, new_height, out=None):
+        """雙線性插值法調整影像大小；out 為預先配置的輸出陣列"""
+        return self.resize_engine.bilinear(img, new_width, new_height, out)
+
+    def bilinear_resize_fixed(self, img, new_width, new_height, bits=8, exact=False):
+        """
+        定點雙線性插值：權重量化為 bits 位元小數 (8 -> 8.8、16 -> 16.16)，以
+        uint16/uint32 整數運算。每個軸向的權重誤差至多 2^-(bits+1)，內插值誤差
+        至多 255 / 2^bits < 1，故截斷後與浮點版本相差不超過 1 個灰階。
+        exact=True 時改走浮點路徑，結果與 bilinear_resize 逐位元相同。
+        """
+        if exact:
+            return self.bilinear_resize(img, new_width, new_height)
+        method = {8: 'bilinear_fixed', 16: 'bilinear_fixed16'}.get(bits)
+        if method is None:
+            raise ValueError(f"定點權重只支援 8 或 16 位元，收到 {bits}")
+        return self.resize_engine.resize(img, new_width, new_height, method)
+
+    def resize(self, img, new_width, new_height, method='bilinear', out=None):
+        """
+        統一的縮放介面；method 可為 nearest、bilinear、area（面積平均）、
+        bicubic 或 lanczos3。後三者以兩次 1-D 稀疏權重運算完成。
+        """
+        return self.resize_engine.resize(img, new_width, new_height, method, out)
+
+    def tiled_resize(self, src_filename, dst_path, new_width, new_height, method='bilinear',
+                     width=512, height=512, tile_rows=256, offset=0):
+        """分塊縮放RAW檔並直接寫入RAW輸出，適用於大於記憶體的影像"""
+        return tiled_resize(self.resolve_path(src_filename), dst_path, width, height,
+                            new_width, new_height, method, tile_rows, offset)
\ No newline at end of file
@@ -0,0 +1,72 @@
+from functools import lru_cache
+
+import numpy as np
+
+# uint8 影像只有 256 種可能值，點運算可預先算成查找表 (LUT)
+LEVELS = np.arange(256)
+
+
+@lru_cache(maxsize=None)
+def _log_table():
+    """log(1 + r) 的浮點表，r 為正規化後的灰階值"""
+    c = 1.0
+    table = c * np.log(1 + LEVELS / 255.0)
+    table.flags.writeable = False
+    return table
+
+
+@lru_cache(maxsize=256)
+def log_lut(max_value):
+    """對數轉換 LUT；結果依影像最大值正規化，因此以最大值為快取鍵"""
+    table = _log_table()
+    lut = (table / table[max_value] * 255).astype(np.uint8)
+    lut.flags.writeable = False
+    return lut
+
+
+@lru_cache(maxsize=64)
+def gamma_lut(gamma):
+    """Gamma 轉換 LUT，依 gamma 值快取"""
+    lut = (np.power(LEVELS / 255.0, gamma) * 255).astype(np.uint8)
+    lut.flags.writeable = False
+    return lut
+
+
+@lru_cache(maxsize=None)
+def negative_lut():
+    """負片 LUT"""
+    lut = (255 - LEVELS).astype(np.uint8)
+    lut.flags.writeable = False
+    return lut
+
+
+# np.take 會先把 uint8 索引轉成 intp（每像素 8 bytes）再查表，
+# 因此每次只處理約這麼多像素，暫存索引的大小固定
+CHUNK_PIXELS = 1 << 16
+
+
+def _take_rows(lut, img, out, r0, r1):
+    """以固定大小的列區塊對 img[..., r0:r1, :] 查表並寫入 out"""
+    row_pixels = img.size // max(img.shape[-2], 1)
+    step = max(1, CHUNK_PIXELS // max(row_pixels, 1))
+    for r in range(r0, r1, step):
+        rows = slice(r, min(r + step, r1))
+        np.take(lut, img[..., rows, :], out=out[..., rows, :], mode='clip')
+
+
+def apply_lut(lut, img, out=None, executor=None):
+    """將 LUT 套用到 uint8 影像，依列分塊查表；指定 executor 時依列分帶平行處理"""
+    if out is None:
+        out = np.empty(img.shape, dtype=np.uint8)
+    if img.ndim < 2:
+        np.take(lut, img, out=out, mode='clip')
+        return out
+    if executor is None or executor.threads == 1:
+        _take_rows(lut, img, out, 0, img.shape[-2])
+        return out
+
+    def run(r0, r1):
+        _take_rows(lut, img, out, r0, r1)
+
+    executor.run_rows(run, img.shape[-2], img.size)
+    return out
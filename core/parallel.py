@@ -0,0 +1,43 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+
+class RowParallelExecutor:
+    """
+    將影像依列切成帶狀區塊，交給執行緒池平行處理。NumPy 的 ufunc 與
+    fancy indexing 會釋放 GIL，因此不需要行程與序列化成本；每條帶寫入
+    輸出的固定位置，結果與單執行緒完全相同。
+    """
+
+    # 輸出像素少於此數時直接在呼叫端執行，避免小影像的排程成本
+    MIN_PIXELS = 1 << 18
+
+    def __init__(self, threads=1):
+        self.threads = max(1, threads or os.cpu_count() or 1)
+        self._pool = None
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.threads)
+        return self._pool
+
+    def bands(self, n_rows):
+        """把 n_rows 列平均切成 threads 條 (r0, r1)"""
+        n_bands = min(self.threads, n_rows)
+        step = -(-n_rows // n_bands)
+        return [(r0, min(r0 + step, n_rows)) for r0 in range(0, n_rows, step)]
+
+    def run_rows(self, func, n_rows, n_pixels):
+        """對每條帶呼叫 func(r0, r1)；單執行緒或影像太小時直接執行"""
+        if self.threads == 1 or n_pixels < self.MIN_PIXELS or n_rows < 2:
+            func(0, n_rows)
+            return
+        futures = [self.pool.submit(func, r0, r1) for r0, r1 in self.bands(n_rows)]
+        for future in futures:
+            future.result()
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
@@ -0,0 +1,169 @@
+import numpy as np
+
+from .lut import apply_lut, gamma_lut, log_lut, negative_lut
+from .resize_engine import ResamplingPlan
+
+
+class PointPipeline:
+    """可串接的點運算管線：將多個點運算融合成單一 LUT，一次掃過影像"""
+
+    POINT_OPS = ('log', 'gamma', 'negative')
+
+    def __init__(self, processor):
+        self.processor = processor
+        self.stages = []
+
+    @classmethod
+    def from_spec(cls, processor, spec):
+        """由文字描述建立管線，例如 log,gamma:0.5,negative,resize:128x128:nearest"""
+        pipeline = cls(processor)
+        for token in filter(None, (t.strip() for t in spec.split(','))):
+            name, *params = token.split(':')
+            if name == 'log':
+                pipeline.log()
+            elif name == 'gamma':
+                pipeline.gamma(float(params[0]) if params else 1.0)
+            elif name == 'negative':
+                pipeline.negative()
+            elif name == 'resize':
+                if not params:
+                    raise ValueError(f"resize 需要指定大小，例如 resize:128x128: {token}")
+                new_width, new_height = (int(v) for v in params[0].lower().split('x'))
+                method = params[1] if len(params) > 1 else 'bilinear'
+                pipeline.resize(new_width, new_height, method)
+            else:
+                raise ValueError(f"未知的運算: {name}")
+        return pipeline
+
+    @property
+    def spec(self):
+        """管線的文字描述，可再交給 from_spec 還原"""
+        tokens = []
+        for stage in self.stages:
+            if stage[0] == 'gamma':
+                tokens.append(f"gamma:{stage[1]}")
+            elif stage[0] == 'resize':
+                tokens.append(f"resize:{stage[1]}x{stage[2]}:{stage[3]}")
+            else:
+                tokens.append(stage[0])
+        return ','.join(tokens)
+
+    # 點運算
+    def log(self):
+        """加入對數轉換"""
+        return self._add_point(('log',))
+
+    def gamma(self, gamma=1.0):
+        """加入Gamma轉換"""
+        return self._add_point(('gamma', float(gamma)))
+
+    def negative(self):
+        """加入影像負片"""
+        return self._add_point(('negative',))
+
+    # 縮放（只能接在點運算之後）
+    def resize(self, new_width, new_height, method='bilinear'):
+        """加入縮放"""
+        if method not in ResamplingPlan.METHODS:
+            raise ValueError(f"不支援的縮放方法: {method}")
+        self.stages.append(('resize', int(new_width), int(new_height), method))
+        return self
+
+    def _add_point(self, stage):
+        if any(s[0] == 'resize' for s in self.stages):
+            raise ValueError("點運算必須放在縮放之前")
+        self.stages.append(stage)
+        return self
+
+    @property
+    def point_stages(self):
+        return [s for s in self.stages if s[0] in self.POINT_OPS]
+
+    @property
+    def resize_stages(self):
+        return [s for s in self.stages if s[0] == 'resize']
+
+    def fuse(self, img):
+        """將點運算合成單一 uint8 LUT；對數轉換需要依中間影像的最大值正規化"""
+        lut = np.arange(256, dtype=np.uint8)
+        present = None
+        for i, stage in enumerate(self.point_stages):
+            if stage[0] == 'log':
+                if i == 0:
+                    max_value = int(img.max())
+                else:
+                    # 中間影像的最大值 = LUT 在影像中出現過的灰階上的最大值
+                    if present is None:
+                        present = np.bincount(img.ravel(), minlength=256) > 0
+                    max_value = int(lut[present].max())
+                lut = log_lut(max_value)[lut]
+            elif stage[0] == 'gamma':
+                lut = gamma_lut(stage[1])[lut]
+            else:
+                lut = negative_lut()[lut]
+        return lut
+
+    def output_shape(self, shape):
+        """輸入大小為 shape 時的輸出大小"""
+        if self.resize_stages:
+            _, new_width, new_height, _ = self.resize_stages[-1]
+            return tuple(shape[:-2]) + (new_height, new_width)
+        return tuple(shape)
+
+    def apply(self, img, out=None, buffers=None):
+        """
+        執行管線；img 可為 (H, W) 或 (N, H, W) 堆疊。
+        out 為結果的輸出陣列；buffers 為呼叫端保留的 dict，各階段的中間結果寫入其中
+        的陣列並在下次呼叫時重複使用，串流處理時每張影像不必重新配置。
+        """
+        resize_stages = self.resize_stages
+        if self.point_stages:
+            if img.ndim > 2 and any(s[0] == 'log' for s in self.point_stages):
+                # 對數轉換依每張影像的最大值正規化，堆疊需逐張融合 LUT
+                frames = img.reshape((-1,) + img.shape[-2:])
+                img = np.stack([self._apply_points(frame) for frame in frames]).reshape(img.shape)
+            else:
+                dst = _buffer(None if resize_stages else out, buffers, 'points', img.shape)
+                img = self._apply_points(img, dst)
+
+        for i, (_, new_width, new_height, method) in enumerate(resize_stages):
+            last = i == len(resize_stages) - 1
+            dst = _buffer(out if last else None, buffers, i,
+                          img.shape[:-2] + (new_height, new_width))
+            scratch = None if buffers is None else buffers.setdefault(('scratch', i), {})
+            img = self.processor.resize_engine.resize(img, new_width, new_height, method, dst,
+                                                      scratch)
+
+        if out is not None and img is not out:
+            np.copyto(out, img)
+            img = out
+        return img
+
+    def _apply_points(self, img, out=None):
+        if img.dtype == np.uint8:
+            return apply_lut(self.fuse(img), img, out, self.processor.executor)
+
+        # 非 uint8 影像無法查表，逐一套用
+        for stage in self.point_stages:
+            if stage[0] == 'log':
+                img = self.processor.log_transform(img)
+            elif stage[0] == 'gamma':
+                img = self.processor.gamma_transform(img, stage[1])
+            else:
+                img = self.processor.image_negative(img)
+        return img
+
+    __call__ = apply
+
+    def __repr__(self):
+        return f"PointPipeline({self.stages})"
+
+
+def _buffer(out, buffers, key, shape):
+    """取得輸出陣列：優先用 out，否則重複使用 buffers 中大小相同的陣列"""
+    if out is not None or buffers is None:
+        return out
+    buf = buffers.get(key)
+    if buf is None or buf.shape != shape:
+        buf = buffers[key] = np.empty(shape, dtype=np.uint8)
+    return buf
@@ -0,0 +1,81 @@
+import numpy as np
+from pathlib import Path
+
+
+class RawImageReader:
+    """以 np.memmap 讀取 RAW 影像，回傳零複製的視圖，只有被存取的區域才會讀入"""
+
+    SUPPORTED_DTYPES = (np.uint8, np.uint16, np.float32)
+
+    def __init__(self, filepath, width=512, height=512, dtype=np.uint8,
+                 offset=0, stride=None, byteorder='<'):
+        """
+        offset: 第一張影像前的檔頭位元組數
+        stride: 相鄰影像起點的位元組間距，預設為一張影像的大小
+        byteorder: 多位元組資料的位元組順序，'<' 小端、'>' 大端、'=' 本機
+        """
+        self.filepath = Path(filepath)
+        self.width = width
+        self.height = height
+        if np.dtype(dtype).type not in self.SUPPORTED_DTYPES:
+            raise ValueError(f"不支援的資料型別: {np.dtype(dtype)}")
+        self.dtype = np.dtype(dtype).newbyteorder(byteorder)
+        self.offset = offset
+
+        self.frame_bytes = width * height * self.dtype.itemsize
+        self.stride = self.frame_bytes if stride is None else stride
+        if self.stride < self.frame_bytes:
+            raise ValueError(f"stride ({self.stride}) 小於單張影像大小 ({self.frame_bytes})")
+
+        file_size = self.filepath.stat().st_size
+        if file_size - offset < self.frame_bytes:
+            raise ValueError(f"{self.filepath} 的大小不足一張 {width}x{height} 影像")
+        self.n_frames = (file_size - offset - self.frame_bytes) // self.stride + 1
+        self._mmap = None
+
+    @property
+    def mmap(self):
+        """整個檔案的位元組記憶體映射（延遲建立）"""
+        if self._mmap is None:
+            self._mmap = np.memmap(self.filepath, dtype=np.uint8, mode='r')
+        return self._mmap
+
+    def frame(self, index=0):
+        """取得第 index 張影像的 (height, width) 視圖"""
+        if not 0 <= index < self.n_frames:
+            raise IndexError(f"影像索引 {index} 超出範圍 (共 {self.n_frames} 張)")
+        start = self.offset + index * self.stride
+        buf = self.mmap[start:start + self.frame_bytes]
+        return buf.view(self.dtype).reshape((self.height, self.width))
+
+    def iter_frames(self, start=0, stop=None):
+        """逐張產生影像視圖；只有正在處理的那張會被讀入，記憶體用量固定"""
+        stop = self.n_frames if stop is None else min(stop, self.n_frames)
+        for index in range(start, stop):
+            yield self.frame(index)
+
+    def __iter__(self):
+        return self.iter_frames()
+
+    def __len__(self):
+        return self.n_frames
+
+    def region(self, y, x, height, width, index=0):
+        """只讀取指定區域，其餘部分不會被載入"""
+        return self.frame(index)[y:y + height, x:x + width]
+
+    def center(self, size=10, index=0):
+        """取得影像中心 size x size 區域（與 get_center_pixels 相同的位置）"""
+        start_y = self.height // 2 - size // 2
+        start_x = self.width // 2 - size // 2
+        return self.region(start_y, start_x, size, size, index)
+
+    def close(self):
+        """釋放記憶體映射"""
+        self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,305 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .kernels import KERNELS, apply_axis_weights, axis_weights
+
+
+class ResamplingPlan:
+    """重取樣計畫：保存某組 (來源尺寸, 目標尺寸, 方法) 的索引與權重表"""
+
+    SEPARABLE_METHODS = tuple(KERNELS)
+    # 定點雙線性：方法名稱 -> 權重小數位元數 (8.8 / 16.16)
+    FIXED_POINT_BITS = {'bilinear_fixed': 8, 'bilinear_fixed16': 16}
+    METHODS = ('nearest', 'bilinear') + SEPARABLE_METHODS + tuple(FIXED_POINT_BITS)
+
+    def __init__(self, src_shape, dst_shape, method):
+        if method not in self.METHODS:
+            raise ValueError(f"不支援的縮放方法: {method}")
+        self.src_shape = tuple(src_shape)
+        self.dst_shape = tuple(dst_shape)
+        self.method = method
+
+        old_height, old_width = self.src_shape
+        new_height, new_width = self.dst_shape
+        if method == 'nearest':
+            src_y, src_x = ResizeEngine.nearest_maps(old_height, old_width,
+                                                     new_height, new_width)
+            self.src_y = src_y[:, None]
+            self.src_x = src_x[None, :]
+        elif method in self.SEPARABLE_METHODS:
+            # 兩個軸向各自一組稀疏權重，縮放拆成兩次 1-D 運算
+            self.row_index, self.row_weights = axis_weights(old_height, new_height, method)
+            self.col_index, self.col_weights = axis_weights(old_width, new_width, method)
+        elif method in self.FIXED_POINT_BITS:
+            bits = self.FIXED_POINT_BITS[method]
+            (y1, y2, dy), (x1, x2, dx) = ResizeEngine.bilinear_maps(
+                old_height, old_width, new_height, new_width)
+            self.y1, self.y2, self.x1, self.x2 = y1, y2, x1, x2
+            # 8 位元權重：中間值 255 * 256 放得進 uint16，最終值放得進 uint32
+            self.acc_dtypes = (np.uint16, np.uint32) if bits <= 8 else (np.uint32, np.uint64)
+            scale = 1 << bits
+            self.bits = bits
+            self.wy = np.round(dy * scale).astype(self.acc_dtypes[0])[:, None]
+            self.wx = np.round(dx * scale).astype(self.acc_dtypes[1])[None, :]
+            self.wy_inv = (scale - self.wy).astype(self.acc_dtypes[0])
+            self.wx_inv = (scale - self.wx).astype(self.acc_dtypes[1])
+        else:
+            (y1, y2, dy), (x1, x2, dx) = ResizeEngine.bilinear_maps(
+                old_height, old_width, new_height, new_width)
+            self.y1, self.y2 = y1[:, None], y2[:, None]
+            self.x1, self.x2 = x1[None, :], x2[None, :]
+            dx = dx[None, :]
+            dy = dy[:, None]
+            # 四個權重圖只算一次，之後每次縮放只剩 gather 與混合
+            self.weights = bilinear_weights(dy, dx)
+
+    @property
+    def key(self):
+        return self.src_shape, self.dst_shape, self.method
+
+    @property
+    def nbytes(self):
+        """計畫所佔記憶體大小"""
+        arrays = [v for v in vars(self).values() if isinstance(v, np.ndarray)]
+        arrays += getattr(self, 'weights', ())
+        return sum(v.nbytes for v in arrays)
+
+    def apply(self, img, rows=None, out=None, scratch=None):
+        """
+        對影像套用計畫，輸出 uint8；img 可為 (H, W) 或 (N, H, W) 堆疊。
+        rows=(r0, r1) 時只計算輸出的第 r0~r1 列，結果與整張計算的對應列相同。
+        out 為預先配置的輸出陣列（大小需與輸出的列範圍相同），結果直接寫入其中。
+        scratch 為呼叫端保留的 dict，nearest/bilinear 的 gather 與累加暫存放在其中，
+        大小不變時重複使用；其他方法的中間結果仍每次配置。
+        """
+        if img.shape[-2:] != self.src_shape:
+            raise ValueError(f"影像大小 {img.shape} 與計畫 {self.src_shape} 不符")
+        r = slice(*rows) if rows is not None else slice(None)
+        if self.method == 'nearest':
+            return nearest_gather(img, self.src_y[r], self.src_x, out,
+                                  *self._scratch(img, scratch, r))
+        if self.method in self.SEPARABLE_METHODS:
+            return self._apply_separable(img, r, out)
+        if self.method in self.FIXED_POINT_BITS:
+            return self._apply_fixed_point(img, r, out)
+        return bilinear_blend(img, self.y1[r], self.y2[r], self.x1, self.x2,
+                              [w[r] for w in self.weights], out,
+                              *self._scratch(img, scratch, r))
+
+    def _scratch(self, img, scratch, r=slice(None)):
+        """
+        取得 nearest/bilinear 的暫存陣列（整張輸出大小，列帶只取對應的列）：
+        來源列 gather、行 gather、累加值與乘積
+        """
+        if scratch is None or self.method not in ('nearest', 'bilinear'):
+            return ()
+        lead = img.shape[:-2]
+        specs = [('rows', lead + (self.dst_shape[0], self.src_shape[1]), img.dtype)]
+        if self.method == 'bilinear':
+            specs += [('gather', lead + self.dst_shape, img.dtype),
+                      ('value', lead + self.dst_shape, np.float64),
+                      ('product', lead + self.dst_shape, np.float64)]
+        buffers = []
+        for name, shape, dtype in specs:
+            buf = scratch.get(name)
+            if buf is None or buf.shape != shape or buf.dtype != dtype:
+                buf = scratch[name] = np.empty(shape, dtype=dtype)
+            buffers.append(buf[..., r, :])
+        return buffers
+
+    def _apply_fixed_point(self, img, r, out):
+        # 先沿列方向內插整列（整數累加），再沿行方向 gather 並內插
+        row_dtype, out_dtype = self.acc_dtypes
+        top = img[..., self.y1[r], :].astype(row_dtype)
+        bottom = img[..., self.y2[r], :].astype(row_dtype)
+        rows = top * self.wy_inv[r] + bottom * self.wy[r]
+
+        left = rows[..., self.x1].astype(out_dtype)
+        right = rows[..., self.x2].astype(out_dtype)
+        value = left * self.wx_inv + right * self.wx
+        # 右移即為截斷，與浮點版本的 int(value) 相同
+        value >>= 2 * self.bits
+        return _store(value, out)
+
+    def _apply_separable(self, img, r, out):
+        row_index, row_weights = self.row_index[r], self.row_weights[r]
+        # 先處理縮小較多的軸，讓第二次運算的中間影像較小
+        if self.dst_shape[0] * self.src_shape[1] <= self.src_shape[0] * self.dst_shape[1]:
+            tmp = apply_axis_weights(img, row_index, row_weights, axis=-2)
+            value = apply_axis_weights(tmp, self.col_index, self.col_weights, axis=-1)
+        else:
+            # 只對這些輸出列用得到的來源列做行方向運算
+            lo, hi = int(row_index.min()), int(row_index.max()) + 1
+            tmp = apply_axis_weights(img[..., lo:hi, :], self.col_index, self.col_weights, axis=-1)
+            value = apply_axis_weights(tmp, row_index - lo, row_weights, axis=-2)
+        # bicubic/Lanczos 有負瓣，需先夾到 [0, 255] 再四捨五入
+        np.clip(value, 0, 255, out=value)
+        value += 0.5
+        return _store(value, out)
+
+
+def bilinear_weights(dy, dx):
+    """由列方向 dy（行向量）與行方向 dx（列向量）計算四鄰點的權重圖"""
+    return (1 - dx) * (1 - dy), dx * (1 - dy), (1 - dx) * dy, dx * dy
+
+
+def _take(img, index, axis, out):
+    """沿單一軸 gather；索引已是 intp，mode='clip' 讓 np.take 直接寫入 out"""
+    return np.take(img, np.ravel(index), axis=axis, out=out, mode='clip')
+
+
+def nearest_gather(img, src_y, src_x, out=None, rows=None):
+    """最近鄰 gather：先取來源列再取行；rows 為來源列的暫存陣列"""
+    gathered = _take(img, src_y, -2, rows)
+    direct = out is not None and out.dtype == img.dtype
+    value = _take(gathered, src_x, -1, out if direct else None)
+    return out if direct else _store(value, out)
+
+
+def bilinear_blend(img, y1, y2, x1, x2, weights, out=None,
+                   rows=None, gather=None, value=None, product=None):
+    """
+    四鄰點 gather 後以 bilinear_weights 的權重混合。整張影像、列帶與分塊
+    縮放共用此運算，權重與加總順序和逐像素版本一致，以確保結果逐位元相同。
+    rows/gather/value/product 為可重複使用的暫存陣列，未指定時才配置。
+    """
+    w11, w21, w12, w22 = weights
+    top = _take(img, y1, -2, rows)
+    value = np.multiply(w11, _take(top, x1, -1, gather), out=value)
+    value += np.multiply(w21, _take(top, x2, -1, gather), out=product)
+    bottom = _take(img, y2, -2, rows)
+    value += np.multiply(w12, _take(bottom, x1, -1, gather), out=product)
+    value += np.multiply(w22, _take(bottom, x2, -1, gather), out=product)
+    # int(value) 對非負值即為截斷
+    return _store(value, out)
+
+
+def _store(value, out):
+    """轉成 uint8；有 out 時直接寫入（與 astype 相同的截斷轉型）"""
+    if out is None:
+        return value.astype(np.uint8, copy=False)
+    np.copyto(out, value, casting='unsafe')
+    return out
+
+
+class PlanCache:
+    """有上限的 LRU 重取樣計畫快取"""
+
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._plans = OrderedDict()
+        # 同一個 ImageProcessor 可能被多個執行緒共用（例如非同步管線）
+        self._lock = threading.Lock()
+
+    def get(self, src_shape, dst_shape, method):
+        """取得計畫，不存在時建立並放入快取"""
+        key = (tuple(src_shape), tuple(dst_shape), method)
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self.hits += 1
+                self._plans.move_to_end(key)
+                return plan
+            self.misses += 1
+
+        plan = ResamplingPlan(src_shape, dst_shape, method)
+        if self.maxsize > 0:
+            with self._lock:
+                self._plans[key] = plan
+                while len(self._plans) > self.maxsize:
+                    self._plans.popitem(last=False)
+        return plan
+
+    def clear(self):
+        """清空快取與計數"""
+        with self._lock:
+            self._plans.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """取得快取統計（其他執行緒可能同時在 get 中更新 LRU 順序，需持有鎖）"""
+        with self._lock:
+            return {
+                'size': len(self._plans),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'nbytes': sum(p.nbytes for p in self._plans.values())
+            }
+
+    def __len__(self):
+        with self._lock:
+            return len(self._plans)
+
+
+class ResizeEngine:
+    """向量化縮放引擎：先計算索引/權重表，再對整張影像做 gather 與混合"""
+
+    def __init__(self, plan_cache=None, executor=None):
+        self.plan_cache = plan_cache if plan_cache is not None else PlanCache()
+        self.executor = executor
+
+    @staticmethod
+    def nearest_maps(old_height, old_width, new_height, new_width):
+        """計算最近鄰插值的列/行來源索引"""
+        scale_x = old_width / new_width
+        scale_y = old_height / new_height
+
+        # 與逐像素迴圈相同：先乘再截斷，最後夾到邊界
+        src_x = (np.arange(new_width) * scale_x).astype(np.intp)
+        src_y = (np.arange(new_height) * scale_y).astype(np.intp)
+        np.minimum(src_x, old_width - 1, out=src_x)
+        np.minimum(src_y, old_height - 1, out=src_y)
+        return src_y, src_x
+
+    @staticmethod
+    def bilinear_maps(old_height, old_width, new_height, new_width):
+        """計算雙線性插值的四鄰點索引與 dx/dy 權重"""
+        scale_x = (old_width - 1) / (new_width - 1) if new_width > 1 else 0
+        scale_y = (old_height - 1) / (new_height - 1) if new_height > 1 else 0
+
+        src_x = np.arange(new_width) * scale_x
+        src_y = np.arange(new_height) * scale_y
+
+        x1 = np.floor(src_x).astype(np.intp)
+        y1 = np.floor(src_y).astype(np.intp)
+        x2 = np.minimum(x1 + 1, old_width - 1)
+        y2 = np.minimum(y1 + 1, old_height - 1)
+
+        dx = src_x - x1
+        dy = src_y - y1
+        return (y1, y2, dy), (x1, x2, dx)
+
+    def resize(self, img, new_width, new_height, method, out=None, scratch=None):
+        """
+        以快取的重取樣計畫調整影像大小；out 為預先配置的輸出陣列，
+        scratch 為呼叫端保留、可重複使用暫存陣列的 dict
+        """
+        plan = self.plan_cache.get(img.shape[-2:], (new_height, new_width), method)
+        if self.executor is None or self.executor.threads == 1:
+            return plan.apply(img, out=out, scratch=scratch)
+
+        # 多執行緒：每條輸出列帶各自計算並寫入固定位置；暫存先配置成整張大小，
+        # 各列帶使用其中不重疊的列
+        if out is None:
+            out = np.empty(img.shape[:-2] + (new_height, new_width), dtype=np.uint8)
+        plan._scratch(img, scratch)
+
+        def run(r0, r1):
+            plan.apply(img, (r0, r1), out[..., r0:r1, :], scratch)
+
+        self.executor.run_rows(run, new_height, out.size)
+        return out
+
+    def nearest(self, img, new_width, new_height, out=None):
+        """最近鄰插值"""
+        return self.resize(img, new_width, new_height, 'nearest', out)
+
+    def bilinear(self, img, new_width, new_height, out=None):
+        """雙線性插值"""
+        return self.resize(img, new_width, new_height, 'bilinear', out)
@@ -0,0 +1,118 @@
+import weakref
+
+import numpy as np
+
+
+class ImageStats:
+    """
+    以單次 np.bincount 得到的灰階計數推導 min/max/mean/std/百分位數與直方圖。
+    計數可直接相加，因此可合併分塊或多張影像的統計。
+    """
+
+    def __init__(self, counts):
+        self.counts = np.asarray(counts, dtype=np.int64)
+
+    @classmethod
+    def from_image(cls, img):
+        """由 uint8/uint16 影像（任意維度）計算統計"""
+        if img.dtype not in (np.uint8, np.uint16):
+            raise TypeError(f"ImageStats 只支援 uint8/uint16 影像，收到 {img.dtype}")
+        levels = 256 if img.dtype == np.uint8 else 65536
+        return cls(np.bincount(img.ravel(), minlength=levels))
+
+    @classmethod
+    def merge(cls, stats_list):
+        """合併多個統計（例如串流讀入的分塊或多張影像）"""
+        stats_list = list(stats_list)
+        levels = max(len(s.counts) for s in stats_list)
+        counts = np.zeros(levels, dtype=np.int64)
+        for s in stats_list:
+            counts[:len(s.counts)] += s.counts
+        return cls(counts)
+
+    def update(self, img):
+        """回傳加入另一塊影像計數後的新統計；原統計（可能來自快取）不變"""
+        return ImageStats.merge([self, ImageStats.from_image(img)])
+
+    def __add__(self, other):
+        return ImageStats.merge([self, other])
+
+    @property
+    def histogram(self):
+        """各灰階的像素數"""
+        return self.counts
+
+    @property
+    def count(self):
+        return int(self.counts.sum())
+
+    @property
+    def min(self):
+        return int(np.flatnonzero(self.counts)[0])
+
+    @property
+    def max(self):
+        return int(np.flatnonzero(self.counts)[-1])
+
+    @property
+    def mean(self):
+        levels = np.arange(len(self.counts))
+        return float(np.dot(levels, self.counts) / self.count)
+
+    @property
+    def std(self):
+        levels = np.arange(len(self.counts))
+        deviation = levels - self.mean
+        return float(np.sqrt(np.dot(deviation * deviation, self.counts) / self.count))
+
+    def percentile(self, q):
+        """百分位數，與 np.percentile 預設的線性內插一致"""
+        cumulative = np.cumsum(self.counts)
+        ranks = np.asarray(q, dtype=np.float64) / 100 * (self.count - 1)
+        lower = np.floor(ranks)
+        # 排序後第 r 個像素的灰階 = 累積計數第一個大於 r 的位置
+        low_value = np.searchsorted(cumulative, lower, side='right')
+        high_value = np.searchsorted(cumulative, np.ceil(ranks), side='right')
+        result = low_value + (high_value - low_value) * (ranks - lower)
+        return float(result) if np.ndim(result) == 0 else result
+
+    def as_dict(self):
+        return {
+            'min': self.min,
+            'max': self.max,
+            'mean': self.mean,
+            'std': self.std
+        }
+
+
+# 依陣列身分快取統計；陣列被回收時自動移除
+_stats_cache = {}
+
+
+def image_stats(img, cache=None):
+    """
+    取得影像統計並依陣列身分快取。預設只快取唯讀陣列（例如記憶體映射或
+    frombuffer 讀入的影像），因為可寫入的陣列可能被原地修改；
+    cache=True/False 可強制開啟或關閉快取。
+    """
+    if cache is None:
+        cache = not img.flags.writeable
+    if not cache:
+        return ImageStats.from_image(img)
+
+    key = id(img)
+    entry = _stats_cache.get(key)
+    if entry is not None and entry[0]() is img:
+        return entry[1]
+
+    stats = ImageStats.from_image(img)
+    # 快取的計數由所有呼叫端共用，設為唯讀
+    stats.counts.flags.writeable = False
+    ref = weakref.ref(img, lambda _, key=key: _stats_cache.pop(key, None))
+    _stats_cache[key] = (ref, stats)
+    return stats
+
+
+def invalidate(img):
+    """移除某個陣列的快取統計（原地修改影像後呼叫）"""
+    _stats_cache.pop(id(img), None)
@@ -0,0 +1,59 @@
+import numpy as np
+
+from .raw_reader import RawImageReader
+from .resize_engine import ResizeEngine, bilinear_blend, bilinear_weights, nearest_gather
+
+
+def _source_rows(method, row_maps, r0, r1):
+    """輸出第 r0~r1 列所需的來源列範圍（含插值用的 halo 列）"""
+    if method == 'nearest':
+        src_y = row_maps[0][r0:r1]
+        return int(src_y[0]), int(src_y[-1]) + 1
+    y1, y2, _ = row_maps
+    return int(y1[r0]), int(y2[r1 - 1]) + 1
+
+
+def _resize_band(strip, method, row_maps, col_maps, r0, r1, s0, out):
+    """
+    縮放一條來源帶狀區域並寫入 out；權重只為這條帶計算（整張影像的權重圖
+    可能放不下記憶體），gather 與混合和 ResamplingPlan 共用同一份運算
+    """
+    if method == 'nearest':
+        src_y = row_maps[0][r0:r1] - s0
+        return nearest_gather(strip, src_y[:, None], col_maps[0][None, :], out)
+
+    y1, y2, dy = (m[r0:r1] for m in row_maps)
+    x1, x2, dx = col_maps
+    weights = bilinear_weights(dy[:, None], dx[None, :])
+    return bilinear_blend(strip, (y1 - s0)[:, None], (y2 - s0)[:, None],
+                          x1[None, :], x2[None, :], weights, out)
+
+
+def tiled_resize(src_path, dst_path, src_width, src_height, new_width, new_height,
+                 method='bilinear', tile_rows=256, offset=0):
+    """
+    分塊縮放記憶體放不下的RAW影像：逐條讀取來源列（含 halo 列）、縮放後
+    直接寫入記憶體映射的RAW輸出。峰值記憶體只與 tile_rows 及影像寬度有關，
+    結果與整張影像在記憶體中縮放完全相同。
+    """
+    if method == 'nearest':
+        src_y, src_x = ResizeEngine.nearest_maps(src_height, src_width, new_height, new_width)
+        row_maps, col_maps = (src_y,), (src_x,)
+    elif method == 'bilinear':
+        row_maps, col_maps = ResizeEngine.bilinear_maps(src_height, src_width,
+                                                        new_height, new_width)
+    else:
+        raise ValueError(f"分塊縮放不支援的方法: {method}")
+
+    src = RawImageReader(src_path, src_width, src_height, offset=offset).frame(0)
+    dst = np.memmap(dst_path, dtype=np.uint8, mode='w+', shape=(new_height, new_width))
+    try:
+        for r0 in range(0, new_height, tile_rows):
+            r1 = min(r0 + tile_rows, new_height)
+            s0, s1 = _source_rows(method, row_maps, r0, r1)
+            strip = np.asarray(src[s0:s1])
+            _resize_band(strip, method, row_maps, col_maps, r0, r1, s0, dst[r0:r1])
+        dst.flush()
+    finally:
+        del dst
+    return dst_path
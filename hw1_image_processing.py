@@ -2,8 +2,11 @@ import numpy as np
 from PIL import Image
 import matplotlib.pyplot as plt
 from pathlib import Path
+import argparse
 import os
 
+from utils.task_graph import TaskGraph, print_report
+
 class ImageProcessor:
     def __init__(self):
         self.data_path = Path("data")
@@ -147,7 +150,107 @@ class ImageProcessor:
         fig.savefig(output_dir / filename, dpi=100, bbox_inches='tight')
         plt.close(fig)
 
+# 各部分的輸入與參數；修改其中一項時只有受影響的工作會重新執行
+RAW_FILES = ['lena.raw', 'goldhill.raw', 'peppers.raw']
+JPG_FILES = ['boat.bmp', 'baboon.bmp', 'F16.bmp']
+GAMMAS = (0.5, 1.5, 2.2)
+RESIZE_SOURCE = 'goldhill.raw'
+# (案例名稱, 來源大小 (None 為原圖), 目標 (寬, 高))
+TEST_CASES = [
+    ("512x512 -> 128x128", None, (128, 128)),
+    ("512x512 -> 32x32", None, (32, 32)),
+    ("32x32 -> 512x512", 32, (512, 512)),
+    ("512x512 -> 1024x512", None, (1024, 512)),
+    ("128x128 -> 256x512", 128, (256, 512))
+]
+
+
+def read_image(filename):
+    """Part A: 讀取影像"""
+    processor = ImageProcessor()
+    if filename.endswith('.raw'):
+        return processor.read_raw_image(filename)
+    return processor.read_jpg_image(filename)
+
+
+def render_figure(*images, titles, filename, figsize=(15, 10)):
+    """將多張影像排版後存檔"""
+    processor = ImageProcessor()
+    fig = processor.display_images(list(images), titles, figsize=figsize)
+    processor.save_figure(fig, filename)
+
+
+def build_graph(processor, output_dir, state_dir):
+    """建立 HW1 的工作圖：read -> enhance/resize -> render"""
+    graph = TaskGraph(state_dir)
+    data_path = processor.data_path
+
+    # Part A: Image Reading
+    files = RAW_FILES + JPG_FILES
+    reads = [graph.add(f"read:{f}", read_image, params={'filename': f},
+                       inputs=[data_path / f]) for f in files]
+    graph.add("render:part_a", render_figure, deps=reads,
+              params={'titles': [f"RAW: {f}" for f in RAW_FILES] +
+                                [f"BMP: {f}" for f in JPG_FILES],
+                      'filename': "part_a_original_images.png"},
+              outputs=[output_dir / "part_a_original_images.png"])
+
+    # Part B: Image Enhancement
+    for idx, (name, read) in enumerate(zip(files, reads)):
+        enhanced = [
+            graph.add(f"enhance:{name}:log", processor.log_transform, deps=[read]),
+            *[graph.add(f"enhance:{name}:gamma:{g}", processor.gamma_transform, deps=[read],
+                        params={'gamma': g}) for g in GAMMAS],
+            graph.add(f"enhance:{name}:negative", processor.image_negative, deps=[read])
+        ]
+        filename = f"part_b_enhancement_{idx}_{name.split('.')[0]}.png"
+        graph.add(f"render:part_b:{name}", render_figure, deps=[read] + enhanced,
+                  params={'titles': [f"Original: {name}", "Log Transform"] +
+                                    [f"Gamma (γ={g})" for g in GAMMAS] + ["Negative"],
+                          'filename': filename},
+                  outputs=[output_dir / filename])
+
+    # Part C: Image Downsampling and Upsampling
+    for case_name, source_size, (new_w, new_h) in TEST_CASES:
+        source = f"read:{RESIZE_SOURCE}"
+        if source_size is not None:
+            source = f"resize:{RESIZE_SOURCE}:bilinear:{source_size}x{source_size}"
+            if source not in graph.tasks:
+                graph.add(source, processor.bilinear_resize, deps=[f"read:{RESIZE_SOURCE}"],
+                          params={'new_width': source_size, 'new_height': source_size})
+        size = {'new_width': new_w, 'new_height': new_h}
+        nn = graph.add(f"resize:{case_name}:nearest", processor.nearest_neighbor_resize,
+                       deps=[source], params=size)
+        bilinear = graph.add(f"resize:{case_name}:bilinear", processor.bilinear_resize,
+                             deps=[source], params=size)
+
+        source_w = source_h = source_size or 512
+        display = source
+        # 如果原圖太小，放大顯示
+        if source_h < 100:
+            display = graph.add(f"resize:{case_name}:display", processor.nearest_neighbor_resize,
+                                deps=[source], params={'new_width': min(source_h * 4, 512),
+                                                       'new_height': min(source_w * 4, 512)})
+
+        case_filename = case_name.replace(" ", "_").replace("->", "to").replace("x", "")
+        filename = f"part_c_resize_{case_filename}.png"
+        graph.add(f"render:part_c:{case_name}", render_figure, deps=[display, nn, bilinear],
+                  params={'titles': [f"Source ({source_w}x{source_h})",
+                                     f"Nearest Neighbor ({new_w}x{new_h})",
+                                     f"Bilinear ({new_w}x{new_h})"],
+                          'filename': filename, 'figsize': (15, 5)},
+                  outputs=[output_dir / filename])
+    return graph
+
+
 def main():
+    parser = argparse.ArgumentParser(description='HW1: Digital Image Processing')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='同時執行的工作行程數 (預設為 CPU 核心數)')
+    parser.add_argument('--force', action='store_true',
+                        help='忽略先前的結果，全部重新計算')
+    args = parser.parse_args()
+
     # 初始化影像處理器
     processor = ImageProcessor()
 
@@ -159,16 +262,16 @@ def main():
     print("HW1: Digital Image Processing")
     print("=" * 50)
 
-    # Part A: Image Reading
+    # 只有輸入、參數或程式碼改變的工作（及其下游）會重新執行，
+    # 各節點上次的指紋與結果存於 output/.tasks
+    graph = build_graph(processor, output_dir, output_dir / ".tasks")
+    report = graph.run(workers=args.jobs, force=args.force)
+
+    # Part A 的報告依檔案順序輸出；讀取工作被略過時使用先前存檔的結果
     print("\n[Part A] Image Reading")
     print("-" * 30)
-
-    # 讀取RAW影像
-    raw_files = ['lena.raw', 'goldhill.raw', 'peppers.raw']
-    raw_images = []
-    for file in raw_files:
-        img = processor.read_raw_image(file)
-        raw_images.append(img)
+    for file in RAW_FILES + JPG_FILES:
+        img = graph.result(f"read:{file}")
         print(f"讀取 {file}: shape={img.shape}, dtype={img.dtype}")
 
         # 取得並顯示中心10x10像素
@@ -177,112 +280,11 @@ def main():
         print(center)
         print()
 
-    # 讀取JPG/BMP影像
-    jpg_files = ['boat.bmp', 'baboon.bmp', 'F16.bmp']
-    jpg_images = []
-    for file in jpg_files:
-        img = processor.read_jpg_image(file)
-        jpg_images.append(img)
-        print(f"讀取 {file}: shape={img.shape}, dtype={img.dtype}")
-
-        # 取得並顯示中心10x10像素
-        center = processor.get_center_pixels(img)
-        print(f"{file} 中心10x10像素值:")
-        print(center)
-        print()
-
-    # 顯示所有原始影像
-    all_images = raw_images + jpg_images
-    all_titles = [f"RAW: {f}" for f in raw_files] + [f"BMP: {f}" for f in jpg_files]
-    fig = processor.display_images(all_images, all_titles)
-    processor.save_figure(fig, "part_a_original_images.png")
-
-    # Part B: Image Enhancement
-    print("\n[Part B] Image Enhancement")
-    print("-" * 30)
-
-    # 對每張影像進行增強處理
-    for idx, (img, name) in enumerate(zip(all_images, raw_files + jpg_files)):
-        print(f"\n處理影像: {name}")
-
-        # Log transform
-        log_img = processor.log_transform(img)
-
-        # Gamma transform (使用不同的gamma值)
-        gamma_05 = processor.gamma_transform(img, gamma=0.5)
-        gamma_15 = processor.gamma_transform(img, gamma=1.5)
-        gamma_22 = processor.gamma_transform(img, gamma=2.2)
-
-        # Image negative
-        negative_img = processor.image_negative(img)
-
-        # 顯示結果
-        enhanced_images = [img, log_img, gamma_05, gamma_15, gamma_22, negative_img]
-        enhanced_titles = [
-            f"Original: {name}",
-            "Log Transform",
-            "Gamma (γ=0.5)",
-            "Gamma (γ=1.5)",
-            "Gamma (γ=2.2)",
-            "Negative"
-        ]
-
-        fig = processor.display_images(enhanced_images, enhanced_titles)
-        processor.save_figure(fig, f"part_b_enhancement_{idx}_{name.split('.')[0]}.png")
-
-    # Part C: Image Downsampling and Upsampling
-    print("\n[Part C] Image Downsampling and Upsampling")
-    print("-" * 30)
-
-    # 使用 Lena 影像進行測試
-    test_img = raw_images[1]  # 使用 goldhill.raw
-
-    # 測試案例
-    test_cases = [
-        ("512x512 -> 128x128", (128, 128)),
-        ("512x512 -> 32x32", (32, 32)),
-        ("32x32 -> 512x512", (512, 512)),
-        ("512x512 -> 1024x512", (1024, 512)),
-        ("128x128 -> 256x512", (256, 512))
-    ]
-
-    for case_name, (new_w, new_h) in test_cases:
-        print(f"\n測試: {case_name}")
-
-        # 如果是從32x32開始，先降採樣到32x32
-        if "32x32 ->" in case_name:
-            source_img = processor.bilinear_resize(test_img, 32, 32)
-        elif "128x128 ->" in case_name:
-            source_img = processor.bilinear_resize(test_img, 128, 128)
-        else:
-            source_img = test_img
-
-        # 使用兩種方法調整大小
-        nn_img = processor.nearest_neighbor_resize(source_img, new_w, new_h)
-        bilinear_img = processor.bilinear_resize(source_img, new_w, new_h)
-
-        # 顯示結果
-        if source_img.shape[0] < 100:  # 如果原圖太小，放大顯示
-            display_source = processor.nearest_neighbor_resize(source_img,
-                                                              min(source_img.shape[0]*4, 512),
-                                                              min(source_img.shape[1]*4, 512))
-        else:
-            display_source = source_img
-
-        resize_images = [display_source, nn_img, bilinear_img]
-        resize_titles = [
-            f"Source ({source_img.shape[1]}x{source_img.shape[0]})",
-            f"Nearest Neighbor ({new_w}x{new_h})",
-            f"Bilinear ({new_w}x{new_h})"
-        ]
-
-        fig = processor.display_images(resize_images, resize_titles, figsize=(15, 5))
-        case_filename = case_name.replace(" ", "_").replace("->", "to").replace("x", "")
-        processor.save_figure(fig, f"part_c_resize_{case_filename}.png")
+    print_report(report)
 
     print("\n" + "=" * 50)
     print("所有處理完成！結果已儲存至 output/ 資料夾")
     print("=" * 50)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
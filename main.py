@@ -4,15 +4,44 @@
 整合各次作業的影像處理功能
 """
 
+import time
+
+_START = time.perf_counter()
+
+import os
 import sys
 from pathlib import Path
 import argparse
 
-from core import ImageProcessor
-from utils import Visualizer, FileIO
+# 重量級模組 (numpy、PIL、matplotlib) 只在各功能分支內才載入，
+# 讓 --help、使用說明與 RAW 對 RAW 的處理不必付出載入成本
+HEAVY_MODULES = ('numpy', 'PIL.Image', 'matplotlib.pyplot')
+
+def report_startup():
+    """量測啟動時間：main.py 開始執行到現在的耗時，以及各重量級模組的載入成本"""
+    import importlib
+
+    print(f"main.py 啟動至參數解析完成: {(time.perf_counter() - _START) * 1000:.1f}ms")
+    preloaded = [name for name in HEAVY_MODULES if name in sys.modules]
+    print(f"已預先載入的重量級模組: {', '.join(preloaded) or '無'}")
+    for name in HEAVY_MODULES + ('core', 'utils'):
+        start = time.perf_counter()
+        importlib.import_module(name)
+        print(f"  import {name:<20s} {(time.perf_counter() - start) * 1000:8.1f}ms")
+    print("更詳細的分析可使用: python -X importtime main.py ...")
+
+def open_cache(args):
+    """依 --cache-dir 建立結果快取"""
+    if not args.cache_dir:
+        return None
+    from utils.result_cache import ResultCache
+    return ResultCache(args.cache_dir, args.cache_size * 2**20)
 
 def hw1_demo():
     """執行HW1的展示功能"""
+    from core import ImageProcessor
+    from utils import Visualizer
+
     processor = ImageProcessor()
     visualizer = Visualizer()
 
@@ -40,12 +69,11 @@ def hw1_demo():
             'Negative': processor.image_negative(img)
         }
 
-        fig = visualizer.display_images(
+        visualizer.save_montage(
             list(enhanced.values()),
             list(enhanced.keys()),
-            figsize=(15, 8)
+            f"demo_{name.split('.')[0]}_enhanced.png"
         )
-        visualizer.save_figure(fig, f"demo_{name.split('.')[0]}_enhanced.png")
 
         # 展示縮放功能
         resized = {
@@ -54,12 +82,11 @@ def hw1_demo():
             'Bilinear (256x256)': processor.bilinear_resize(img, 256, 256)
         }
 
-        fig = visualizer.display_images(
+        visualizer.save_montage(
             list(resized.values()),
             list(resized.keys()),
-            figsize=(12, 4)
+            f"demo_{name.split('.')[0]}_resized.png"
         )
-        visualizer.save_figure(fig, f"demo_{name.split('.')[0]}_resized.png")
 
     print("\n展示完成！結果已儲存至 output/ 資料夾")
 
@@ -73,26 +100,140 @@ def main():
                         help='輸入影像路徑')
     parser.add_argument('--output', type=str, default='output',
                         help='輸出資料夾路徑')
+    parser.add_argument('--batch', type=str,
+                        help='批次處理：輸入資料夾或 glob 樣式 (例如 "data/*.raw")')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='批次處理的工作行程數 (預設為 CPU 核心數)')
+    parser.add_argument('--startup-time', action='store_true',
+                        help='量測啟動與模組載入時間')
+    parser.add_argument('--profile', nargs='?', const=True, default=None,
+                        metavar='PATH',
+                        help='開啟逐方法的耗時/資料量量測，結束時輸出 JSON '
+                             '(也可設定環境變數 MMIP_PROFILE)')
+    parser.add_argument('--bench', action='store_true',
+                        help='執行效能基準測試')
+    parser.add_argument('--bench-output', type=str, default='benchmark.json',
+                        help='基準測試結果 JSON 路徑')
+    parser.add_argument('--bench-baseline', type=str,
+                        help='比較用的基準結果 JSON，變慢超過門檻時回傳非零結束碼')
+    parser.add_argument('--bench-threads', type=int, default=None, metavar='N',
+                        help='另外執行 1~N 個執行緒的擴展性測試')
+    parser.add_argument('--bench-threshold', type=float, default=0.10,
+                        help='效能退化門檻 (預設 0.10 = 慢 10%%)')
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help='批次處理改用非同步管線，讀檔/運算/寫檔互相重疊')
+    parser.add_argument('--queue-size', type=int, default=8,
+                        help='非同步管線各階段之間的佇列上限')
+    parser.add_argument('--cache-dir', type=str, default=None,
+                        help='結果快取資料夾；輸入與參數未變時略過解碼與運算')
+    parser.add_argument('--cache-size', type=int, default=1024,
+                        help='結果快取上限 (MB)，超過時淘汰最久未使用的項目')
+    parser.add_argument('--container', type=str, default=None, metavar='NAME',
+                        help='批次結果寫入輸出資料夾中的單一容器檔 (含索引，可隨機存取)')
+    parser.add_argument('--serve', action='store_true',
+                        help='啟動常駐的本機影像處理 HTTP 服務 (POST /process, GET /stats)')
+    parser.add_argument('--host', type=str, default='127.0.0.1',
+                        help='服務監聽位址')
+    parser.add_argument('--port', type=int, default=8000,
+                        help='服務監聽埠')
+    parser.add_argument('--coalesce-ms', type=float, default=2.0,
+                        help='合併相同運算請求的等待時間 (ms)，0 表示不等待')
+    parser.add_argument('--stream', type=str, default=None, metavar='SOURCE',
+                        help='串流處理影格序列：影像資料夾、多張串接的 RAW 檔，或 "-" 讀取 stdin')
+    parser.add_argument('--stream-output', type=str, default=None, metavar='PATH',
+                        help='串流輸出的 RAW 檔，"-" 為 stdout (預設不輸出，只量測 fps)')
+    parser.add_argument('--frame-size', type=str, default='512x512',
+                        help='RAW 影像/影格大小 (寬x高)，用於批次與串流處理')
+    parser.add_argument('--threads', type=int, default=1,
+                        help='單一影像處理時縮放與點運算使用的執行緒數')
+    parser.add_argument('--ops', type=str, default='log',
+                        help='批次處理的運算串，例如 "gamma:0.5,negative,resize:128x128:bilinear"')
 
     args = parser.parse_args()
 
-    if args.demo:
+    if args.startup_time:
+        report_startup()
+        return
+
+    if args.profile:
+        from utils import profiling
+        profiling.enable() if args.profile is True else profiling.enable(args.profile)
+    elif os.environ.get('MMIP_PROFILE'):
+        from utils import profiling
+        profiling.enable_from_env()
+
+    if args.bench:
+        from utils import FileIO
+        from utils.benchmark import compare, run_benchmarks, run_thread_scaling, save_results
+
+        report = run_benchmarks()
+        if args.bench_threads:
+            report['thread_scaling'] = run_thread_scaling(args.bench_threads)
+        save_results(report, args.bench_output)
+        print(f"基準測試結果已儲存至: {args.bench_output}")
+        if args.bench_baseline:
+            regressions = compare(report, FileIO.load_config(args.bench_baseline),
+                                  args.bench_threshold)
+            if regressions:
+                print(f"發現 {len(regressions)} 項效能退化")
+                sys.exit(1)
+    elif args.stream:
+        from utils.stream import print_stream_summary, run_stream
+
+        width, height = (int(v) for v in args.frame_size.lower().split('x'))
+        stats = run_stream(args.stream, args.ops, args.stream_output, width, height,
+                           args.threads)
+        # 影格輸出到 stdout 時，統計改印到 stderr
+        print_stream_summary(stats, sys.stderr if args.stream_output == '-' else sys.stdout)
+    elif args.serve:
+        from utils.server import serve
+
+        serve(args.host, args.port, args.threads, args.coalesce_ms / 1000)
+    elif args.demo:
         if args.hw == 1 or args.hw is None:
             hw1_demo()
         elif args.hw == 2:
             print("HW2 功能尚未實作")
         elif args.hw == 3:
             print("HW3 功能尚未實作")
+    elif args.batch:
+        from utils.batch import collect_inputs, run_batch, run_batch_async
+
+        inputs = collect_inputs(args.batch)
+        if not inputs:
+            print(f"找不到輸入影像: {args.batch}")
+            return
+        print(f"批次處理 {len(inputs)} 張影像, 運算: {args.ops}")
+        width, height = (int(v) for v in args.frame_size.lower().split('x'))
+        cache = open_cache(args)
+        if args.use_async:
+            run_batch_async(inputs, args.ops, args.output, args.workers, width, height,
+                            queue_size=args.queue_size, cache=cache, container=args.container)
+        else:
+            run_batch(inputs, args.ops, args.output, args.workers, width, height, cache=cache,
+                      container=args.container)
     elif args.input:
         # 處理單一影像
-        processor = ImageProcessor()
+        from core import ImageProcessor
+        from utils import Visualizer, FileIO
+
+        processor = ImageProcessor(threads=args.threads)
         visualizer = Visualizer(args.output)
 
+        # 有結果快取時，未變更的輸入連解碼都可略過
+        cache = open_cache(args)
+        digest = cache.file_digest(processor.resolve_path(args.input)) if cache else None
+
+        def cached(ops, compute):
+            if cache is None:
+                return compute()
+            return cache.get_or_compute(cache.make_key(digest, ops), compute)
+
         # 讀取影像
         if args.input.endswith('.raw'):
-            img = processor.read_raw_image(args.input)
+            img = cached('decode', lambda: processor.read_raw_image(args.input))
         else:
-            img = processor.read_jpg_image(args.input)
+            img = cached('decode', lambda: processor.read_jpg_image(args.input))
 
         print(f"已讀取影像: {args.input}")
         print(f"影像大小: {img.shape}")
@@ -105,17 +246,19 @@ def main():
         # 執行基本處理
         processed = {
             'Original': img,
-            'Enhanced (Log)': processor.log_transform(img),
-            'Enhanced (Gamma)': processor.gamma_transform(img, 1.5)
+            'Enhanced (Log)': cached('log', lambda: processor.log_transform(img)),
+            'Enhanced (Gamma)': cached('gamma:1.5', lambda: processor.gamma_transform(img, 1.5))
         }
 
-        fig = visualizer.display_images(
+        output_name = Path(args.input).stem + "_processed.png"
+        visualizer.save_montage(
             list(processed.values()),
-            list(processed.keys())
+            list(processed.keys()),
+            output_name
         )
-        output_name = Path(args.input).stem + "_processed.png"
-        visualizer.save_figure(fig, output_name)
         print(f"結果已儲存至: {args.output}/{output_name}")
+        if cache:
+            print(f"結果快取: 命中 {cache.hits}, 未命中 {cache.misses}")
     else:
         print("多模態影像處理系統")
         print("-" * 30)
@@ -123,6 +266,11 @@ def main():
         print("  python main.py --demo          # 執行展示")
         print("  python main.py --hw 1 --demo   # 執行HW1展示")
         print("  python main.py --input image.bmp  # 處理單一影像")
+        print("  python main.py --bench         # 效能基準測試")
+        print("  python main.py --startup-time  # 量測啟動時間")
+        print("  python main.py --batch data --workers 4 --ops gamma:0.5  # 批次處理")
+        print("  python main.py --serve --port 8000  # 本機影像處理服務")
+        print("  python main.py --stream frames/ --ops gamma:0.5  # 串流處理影格序列")
         print("\n可用功能:")
         print("  - HW1: 影像讀取、點運算、縮放")
         print("  - HW2: (待實作)")
@@ -0,0 +1,129 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+STAGES = ('read', 'process', 'write')
+_DONE = object()
+
+
+class StageStats:
+    """單一階段的處理量與耗時"""
+
+    def __init__(self, name, workers=1):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.busy_s = 0.0
+
+    def as_dict(self, elapsed):
+        return {
+            'workers': self.workers,
+            'items': self.items,
+            'busy_s': self.busy_s,
+            'items_per_s': self.items / elapsed if elapsed else 0.0,
+            # 平均同時執行的工作數，>1 表示此階段有平行處理
+            'concurrency': self.busy_s / elapsed if elapsed else 0.0
+        }
+
+
+class AsyncPipelineRunner:
+    """
+    讀取 -> 處理 -> 寫入 三階段的非同步管線。階段之間以有上限的 asyncio.Queue
+    相連：下游跟不上時佇列會滿，上游的 put 就會等待（背壓），記憶體中的影像
+    數量因此有上限。讀寫在 I/O 執行緒池、運算在另一個執行器中進行，I/O 與
+    運算互相重疊，總時間趨近於最慢階段的耗時。
+    """
+
+    def __init__(self, read_fn, process_fn, write_fn, queue_size=8,
+                 io_workers=2, compute_workers=1, compute_executor=None):
+        self.funcs = {'read': read_fn, 'process': process_fn, 'write': write_fn}
+        self.queue_size = queue_size
+        self.workers = {'read': io_workers, 'process': compute_workers, 'write': io_workers}
+        self.compute_executor = compute_executor
+        self.stats = {name: StageStats(name, self.workers[name]) for name in STAGES}
+
+    async def _stage(self, name, executor, in_queue, out_queue):
+        """同一階段的 n 個工作協程：從上游取資料、交給執行器、放到下游"""
+        loop = asyncio.get_running_loop()
+        func = self.funcs[name]
+        stats = self.stats[name]
+
+        async def worker():
+            while True:
+                entry = await in_queue.get()
+                if entry is _DONE:
+                    return
+                item, data = entry
+                start = time.perf_counter()
+                args = (item,) if name == 'read' else (data,) if name == 'process' else (item, data)
+                result = await loop.run_in_executor(executor, func, *args)
+                stats.busy_s += time.perf_counter() - start
+                stats.items += 1
+                await out_queue.put((item, result))
+
+        await asyncio.gather(*(worker() for _ in range(self.workers[name])))
+
+    async def _feed(self, items, queue):
+        for item in items:
+            await queue.put((item, None))
+        for _ in range(self.workers['read']):
+            await queue.put(_DONE)
+
+    async def _run_stage(self, name, executor, in_queue, out_queue, downstream):
+        await self._stage(name, executor, in_queue, out_queue)
+        for _ in range(downstream):
+            await out_queue.put(_DONE)
+
+    async def _collect(self, queue, results):
+        done = 0
+        while done < self.workers['write']:
+            entry = await queue.get()
+            if entry is _DONE:
+                done += 1
+            else:
+                results.append(entry[1])
+
+    async def run_async(self, items):
+        """執行管線，回傳寫入階段的結果與各階段統計"""
+        queues = [asyncio.Queue(self.queue_size) for _ in range(4)]
+        results = []
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(self.workers['read'] + self.workers['write']) as io_pool:
+            compute_pool = self.compute_executor or ThreadPoolExecutor(self.workers['process'])
+            try:
+                await asyncio.gather(
+                    self._feed(items, queues[0]),
+                    self._run_stage('read', io_pool, queues[0], queues[1],
+                                    self.workers['process']),
+                    self._run_stage('process', compute_pool, queues[1], queues[2],
+                                    self.workers['write']),
+                    self._run_stage('write', io_pool, queues[2], queues[3],
+                                    self.workers['write']),
+                    self._collect(queues[3], results)
+                )
+            finally:
+                if compute_pool is not self.compute_executor:
+                    compute_pool.shutdown()
+        elapsed = time.perf_counter() - start
+
+        summary = {name: s.as_dict(elapsed) for name, s in self.stats.items()}
+        summary['elapsed_s'] = elapsed
+        return results, summary
+
+    def run(self, items):
+        """同步呼叫介面"""
+        return asyncio.run(self.run_async(items))
+
+
+def print_stage_summary(summary):
+    """輸出各階段吞吐量，並與最慢階段比較"""
+    elapsed = summary['elapsed_s']
+    # 各階段單獨執行所需時間 = 忙碌時間 / 工作數
+    slowest = max(summary[name]['busy_s'] / summary[name]['workers'] for name in STAGES)
+    print("-" * 30)
+    for name in STAGES:
+        s = summary[name]
+        print(f"  {name:<8s} {s['items']:6d} 張  忙碌 {s['busy_s']:.2f}s  "
+              f"{s['items_per_s']:8.1f} 張/s  平均並行 {s['concurrency']:.2f}")
+    print(f"總時間: {elapsed:.2f}s (最慢階段約 {slowest:.2f}s)")
@@ -0,0 +1,247 @@
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from core import ImageProcessor, PointPipeline
+from .async_pipeline import AsyncPipelineRunner, print_stage_summary
+from .container import ContainerWriter
+from .file_io import FileIO
+
+IMAGE_SUFFIXES = ('.raw', '.bmp', '.jpg', '.jpeg', '.png', '.tif', '.tiff')
+
+# 每個工作行程各自保留一個 ImageProcessor，讓 LUT 與重取樣計畫在同一行程內重複使用
+_processor = None
+
+
+def collect_inputs(source):
+    """由資料夾或 glob 樣式取得輸入影像清單"""
+    path = Path(source)
+    if path.is_dir():
+        files = [p for p in path.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES]
+    else:
+        files = [Path(p) for p in glob.glob(source, recursive=True)]
+        files = [p for p in files if p.suffix.lower() in IMAGE_SUFFIXES]
+    return sorted(p.resolve() for p in files)
+
+
+def output_path(input_path, output_dir):
+    """RAW 輸入寫回 RAW，其他格式寫成 PNG"""
+    suffix = '.raw' if input_path.suffix.lower() == '.raw' else '.png'
+    return Path(output_dir) / f"{input_path.stem}_processed{suffix}"
+
+
+def cache_key(cache, input_path, ops, width, height):
+    """結果快取鍵：輸入檔內容 + 運算串 + RAW 尺寸"""
+    return cache.make_key(cache.file_digest(input_path), ops, width=width, height=height)
+
+
+def _error_record(input_path, exc):
+    """單一檔案失敗時的結果紀錄，整批處理繼續進行"""
+    return {'input': str(input_path), 'error': f"{type(exc).__name__}: {exc}"}
+
+
+def process_file(input_path, ops, output_dir, width=512, height=512, cache=None):
+    """
+    處理單一檔案並回傳各階段耗時（工作行程中執行）；快取命中時略過解碼與運算。
+    output_dir 為 None 時不寫檔，結果放在回傳值的 'result' 交給主行程寫入容器檔。
+    檔案無法讀取或處理時回傳含 'error' 的紀錄，不中斷整批處理。
+    """
+    try:
+        return _process_file(input_path, ops, output_dir, width, height, cache)
+    except Exception as exc:
+        return _error_record(input_path, exc)
+
+
+def _process_file(input_path, ops, output_dir, width, height, cache):
+    global _processor
+    if _processor is None:
+        _processor = ImageProcessor()
+
+    input_path = Path(input_path)
+    t0 = time.perf_counter()
+    key = cache_key(cache, input_path, ops, width, height) if cache else None
+    result = cache.get(key) if cache else None
+    cached = result is not None
+    if not cached:
+        img = _processor.read_image(str(input_path), width, height)
+    t1 = time.perf_counter()
+    if not cached:
+        result = PointPipeline.from_spec(_processor, ops).apply(img)
+        if cache:
+            cache.put(key, result)
+    t2 = time.perf_counter()
+
+    out_path = None
+    if output_dir is not None:
+        out_path = output_path(input_path, output_dir)
+        if out_path.suffix == '.raw':
+            FileIO.write_raw(result, out_path)
+        else:
+            FileIO.write_image(result, out_path)
+    t3 = time.perf_counter()
+
+    res = {
+        'input': str(input_path),
+        'output': str(out_path) if out_path else None,
+        'shape': result.shape,
+        # 以輸出像素數計算吞吐量，快取命中與否都一致
+        'pixels': result.size,
+        'cached': cached,
+        'read': t1 - t0,
+        'process': t2 - t1,
+        'write': t3 - t2,
+        'total': t3 - t0
+    }
+    if output_dir is None:
+        res['result'] = result
+    return res
+
+
+def open_container(container, output_dir):
+    """在輸出資料夾中建立容器檔；已存在時繼續附加"""
+    return ContainerWriter(Path(output_dir) / container, append=True)
+
+
+def run_batch(inputs, ops, output_dir, workers=None, width=512, height=512, verbose=True,
+              cache=None, container=None):
+    """
+    以 ProcessPoolExecutor 平行處理多張影像，回傳每張影像的計時結果。
+    指定 container 時所有結果寫入輸出資料夾中的單一容器檔，而非每張一個檔案。
+    """
+    # 先在主行程檢查運算串，避免錯誤在每個工作行程中各自發生
+    PointPipeline.from_spec(None, ops)
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    # 大量小檔案時以 chunk 派送，降低行程間通訊成本
+    chunksize = max(1, len(inputs) // (workers * 8))
+    writer = open_container(container, output_dir) if container else None
+    worker_output = output_dir if writer is None else None
+
+    results = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        jobs = executor.map(process_file, inputs, [ops] * len(inputs),
+                            [worker_output] * len(inputs), [width] * len(inputs),
+                            [height] * len(inputs), [cache] * len(inputs),
+                            chunksize=chunksize)
+        for res in jobs:
+            results.append(res)
+            if 'error' in res:
+                if verbose:
+                    print_error(res)
+                continue
+            if writer is not None:
+                t = time.perf_counter()
+                writer.append(res.pop('result'), name=Path(res['input']).name, ops=ops)
+                res['output'] = str(writer.filepath)
+                res['write'] = time.perf_counter() - t
+                res['total'] += res['write']
+            if verbose:
+                print(f"{Path(res['input']).name}: read={res['read'] * 1000:.1f}ms "
+                      f"process={res['process'] * 1000:.1f}ms "
+                      f"write={res['write'] * 1000:.1f}ms"
+                      + (" (cached)" if res['cached'] else ""))
+    if writer is not None:
+        writer.close()
+    elapsed = time.perf_counter() - start
+
+    if verbose:
+        print_summary(results, elapsed, workers)
+    return results
+
+
+def run_batch_async(inputs, ops, output_dir, workers=None, width=512, height=512,
+                    queue_size=8, verbose=True, cache=None, container=None):
+    """
+    以非同步三階段管線處理多張影像：讀檔與寫檔在 I/O 執行緒池、運算在
+    workers 個執行緒中進行，階段之間以有上限的佇列提供背壓；
+    指定 container 時結果寫入單一容器檔
+    """
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    writer = open_container(container, output_dir) if container else None
+    processor = ImageProcessor()
+    pipeline = PointPipeline.from_spec(processor, ops)
+
+    # 讀取或運算失敗時，錯誤紀錄沿管線傳到寫入階段，成為該檔案的結果
+    def read(path):
+        try:
+            # 快取命中時連解碼都不需要
+            if cache:
+                key = cache_key(cache, path, ops, width, height)
+                result = cache.get(key)
+                if result is not None:
+                    return None, key, result
+                return processor.read_image(str(path), width, height), key, None
+            return processor.read_image(str(path), width, height), None, None
+        except Exception as exc:
+            return _error_record(path, exc)
+
+    def process(data):
+        if isinstance(data, dict):
+            return data
+        img, key, result = data
+        if result is None:
+            try:
+                result = pipeline.apply(img)
+            except Exception as exc:
+                return {'error': f"{type(exc).__name__}: {exc}"}
+            if cache:
+                cache.put(key, result)
+        return result
+
+    def write(path, result):
+        if isinstance(result, dict):
+            return {**result, 'input': str(path)}
+        if writer is not None:
+            writer.append(result, name=Path(path).name, ops=ops)
+            return {'input': str(path), 'output': str(writer.filepath), 'pixels': result.size}
+        out_path = output_path(Path(path), output_dir)
+        if out_path.suffix == '.raw':
+            FileIO.write_raw(result, out_path)
+        else:
+            FileIO.write_image(result, out_path)
+        return {'input': str(path), 'output': str(out_path), 'pixels': result.size}
+
+    runner = AsyncPipelineRunner(read, process, write, queue_size=queue_size,
+                                 compute_workers=workers)
+    try:
+        results, summary = runner.run(inputs)
+    finally:
+        if writer is not None:
+            writer.close()
+    if verbose:
+        failed = [r for r in results if 'error' in r]
+        for res in failed:
+            print_error(res)
+        print_stage_summary(summary)
+        if failed:
+            print(f"失敗: {len(failed)}/{len(results)}")
+    return results, summary
+
+
+def print_error(res):
+    print(f"{Path(res['input']).name}: 失敗 ({res['error']})")
+
+
+def print_summary(results, elapsed, workers):
+    """輸出整批處理的吞吐量統計"""
+    failed = sum('error' in r for r in results)
+    results = [r for r in results if 'error' not in r]
+    n = len(results)
+    print("-" * 30)
+    print(f"影像數: {n + failed}, 工作行程: {workers}, 總時間: {elapsed:.2f}s")
+    if failed:
+        print(f"失敗: {failed}/{n + failed}")
+    if n == 0:
+        return
+    pixels = sum(r['pixels'] for r in results)
+    cached = sum(r['cached'] for r in results)
+    if cached:
+        print(f"快取命中: {cached}/{n}")
+    for stage in ('read', 'process', 'write', 'total'):
+        mean = sum(r[stage] for r in results) / n
+        print(f"  {stage:<8s} 平均 {mean * 1000:.2f}ms/張")
+    print(f"吞吐量: {n / elapsed:.1f} 張/s, {pixels / elapsed / 1e6:.2f} MPix/s")
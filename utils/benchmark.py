@@ -0,0 +1,180 @@
+import json
+import os
+import platform
+import time
+import tracemalloc
+
+import numpy as np
+
+from core import ImageProcessor
+
+# hw1_image_processing.py Part C 的測試案例：(來源邊長, 目標寬, 目標高)
+HW1_RESIZE_CASES = [
+    (512, 128, 128),
+    (512, 32, 32),
+    (32, 512, 512),
+    (512, 1024, 512),
+    (128, 256, 512)
+]
+SYNTHETIC_SIZES = [1024, 2048]
+
+
+def time_call(func, repeat=5, min_time=0.2):
+    """重複執行並回傳每次呼叫的耗時（秒）；每輪至少執行 min_time 秒"""
+    func()  # 預熱：建立 LUT 與重取樣計畫
+    start = time.perf_counter()
+    func()
+    single = time.perf_counter() - start
+    number = max(1, int(min_time / max(single, 1e-9) / repeat))
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+    return samples
+
+
+def peak_memory(func):
+    """單次呼叫的 Python/NumPy 峰值記憶體配置量（位元組）"""
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def measure(func, pixels, repeat=5):
+    """量測單一項目：中位數耗時、ops/s、MPix/s 與峰值記憶體"""
+    samples = time_call(func, repeat)
+    median = float(np.median(samples))
+    return {
+        'median_s': median,
+        'min_s': float(min(samples)),
+        'ops_per_s': 1.0 / median,
+        'mpix_per_s': pixels / median / 1e6,
+        'peak_bytes': peak_memory(func)
+    }
+
+
+def build_cases(processor, sizes=SYNTHETIC_SIZES):
+    """建立所有基準測試項目：名稱 -> (函式, 處理像素數)"""
+    rng = np.random.default_rng(0)
+    lena = processor.read_raw_image('lena.raw')
+    cases = {
+        'read_raw_image[lena.raw]': (lambda: processor.read_raw_image('lena.raw'), lena.size),
+        'read_jpg_image[boat.bmp]': (lambda: processor.read_jpg_image('boat.bmp'), lena.size)
+    }
+
+    images = {'512x512': lena}
+    for size in sizes:
+        images[f"{size}x{size}"] = rng.integers(0, 256, (size, size), dtype=np.uint8)
+
+    for label, img in images.items():
+        cases[f"log_transform[{label}]"] = (lambda img=img: processor.log_transform(img), img.size)
+        cases[f"gamma_transform[{label}]"] = (
+            lambda img=img: processor.gamma_transform(img, 0.5), img.size)
+        cases[f"image_negative[{label}]"] = (lambda img=img: processor.image_negative(img), img.size)
+        cases[f"histogram_equalization[{label}]"] = (
+            lambda img=img: processor.histogram_equalization(img), img.size)
+        cases[f"clahe[{label}]"] = (lambda img=img: processor.clahe(img), img.size)
+
+    resize_cases = list(HW1_RESIZE_CASES)
+    resize_cases += [(size, size // 2, size // 2) for size in sizes]
+    resize_cases += [(size, size * 2, size * 2) for size in sizes[:1]]
+    for src, new_w, new_h in resize_cases:
+        img = lena if src == 512 else processor.bilinear_resize(lena, src, src)
+        label = f"{src}x{src}->{new_w}x{new_h}"
+        cases[f"nearest_neighbor_resize[{label}]"] = (
+            lambda img=img, w=new_w, h=new_h: processor.nearest_neighbor_resize(img, w, h),
+            new_w * new_h)
+        cases[f"bilinear_resize[{label}]"] = (
+            lambda img=img, w=new_w, h=new_h: processor.bilinear_resize(img, w, h),
+            new_w * new_h)
+        cases[f"bilinear_resize_fixed[{label}]"] = (
+            lambda img=img, w=new_w, h=new_h: processor.bilinear_resize_fixed(img, w, h),
+            new_w * new_h)
+        for method in ('area', 'bicubic', 'lanczos3'):
+            cases[f"resize_{method}[{label}]"] = (
+                lambda img=img, w=new_w, h=new_h, m=method: processor.resize(img, w, h, m),
+                new_w * new_h)
+    return cases
+
+
+def run_benchmarks(processor=None, sizes=SYNTHETIC_SIZES, repeat=5, verbose=True):
+    """執行全部基準測試並回傳結果字典"""
+    processor = processor or ImageProcessor()
+    results = {}
+    for name, (func, pixels) in build_cases(processor, sizes).items():
+        results[name] = measure(func, pixels, repeat)
+        if verbose:
+            r = results[name]
+            print(f"{name:<50s} {r['median_s'] * 1000:9.3f}ms {r['ops_per_s']:10.1f} ops/s "
+                  f"{r['mpix_per_s']:9.1f} MPix/s {r['peak_bytes'] / 2**20:8.2f} MiB")
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')
+        },
+        'results': results
+    }
+
+
+def run_thread_scaling(max_threads=None, size=2048, repeat=3, verbose=True):
+    """
+    多執行緒擴展性測試：以 1 ~ max_threads 個執行緒執行縮放與查表運算，
+    回傳各執行緒數的耗時與相對單執行緒的加速比，並確認輸出完全相同。
+    """
+    max_threads = max_threads or os.cpu_count() or 1
+    counts = sorted({1, max_threads} | {n for n in (2, 4, 8, 16, 32) if n < max_threads})
+    img = np.random.default_rng(0).integers(0, 256, (size, size), dtype=np.uint8)
+    operations = {
+        'gamma_transform': lambda p: p.gamma_transform(img, 0.5),
+        'bilinear_resize_2x': lambda p: p.bilinear_resize(img, size * 2, size * 2),
+        'bilinear_resize_fixed_2x': lambda p: p.bilinear_resize_fixed(img, size * 2, size * 2),
+        'resize_lanczos3_half': lambda p: p.resize(img, size // 2, size // 2, 'lanczos3')
+    }
+
+    results = {}
+    for name, op in operations.items():
+        reference = op(ImageProcessor())
+        results[name] = {}
+        for threads in counts:
+            processor = ImageProcessor(threads=threads)
+            if not np.array_equal(op(processor), reference):
+                raise AssertionError(f"{name} 在 {threads} 個執行緒下結果不同")
+            median = float(np.median(time_call(lambda: op(processor), repeat)))
+            processor.executor.shutdown()
+            base = results[name][1]['median_s'] if threads > 1 else median
+            results[name][threads] = {'median_s': median, 'speedup': base / median}
+            if verbose:
+                print(f"{name:<28s} threads={threads:<3d} {median * 1000:9.2f}ms "
+                      f"x{base / median:5.2f}")
+    return results
+
+
+def save_results(report, filepath):
+    """儲存基準測試結果 (JSON)"""
+    with open(filepath, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def compare(report, baseline, threshold=0.10):
+    """與基準比較；中位數耗時變慢超過 threshold 的項目視為效能退化"""
+    regressions = []
+    for name, result in report['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        ratio = result['median_s'] / base['median_s']
+        status = 'REGRESSION' if ratio > 1 + threshold else 'ok'
+        print(f"{name:<50s} {base['median_s'] * 1000:9.3f}ms -> "
+              f"{result['median_s'] * 1000:9.3f}ms ({ratio:5.2f}x) {status}")
+        if status != 'ok':
+            regressions.append((name, ratio))
+    return regressions
@@ -0,0 +1,212 @@
+import json
+import struct
+import threading
+from pathlib import Path
+
+import numpy as np
+
+# 檔案結構：
+#   檔頭 (64 bytes)  : MAGIC | 版本 | 索引位置 | 索引長度
+#   紀錄 ...          : REC_MAGIC | 描述長度 | JSON 描述 | 對齊 | 影像資料 | 對齊
+#   索引 (JSON)       : 全域 meta 與每張影像的 offset/shape/dtype/meta
+# 索引在 flush/close 時寫在最後一筆紀錄之後；繼續附加前會先把檔頭的索引位置
+# 清為 0 並截掉舊索引，再從該處覆寫。索引位置為 0 的檔案（寫入中或未正常
+# 關閉）由逐筆紀錄描述重建索引。
+MAGIC = b'MMIPCTR1'
+REC_MAGIC = b'MREC'
+HEADER = struct.Struct('<8sIIQQ')
+RECORD = struct.Struct('<4sI')
+VERSION = 1
+ALIGN = 64
+
+
+def _align(n):
+    return -(-n // ALIGN) * ALIGN
+
+
+class ContainerWriter:
+    """
+    將多張影像寫入單一容器檔，可邊寫邊附加；append=True 時開啟既有檔案繼續寫入。
+    多個執行緒可共用同一個 writer。
+    """
+
+    def __init__(self, filepath, meta=None, append=False):
+        self.filepath = Path(filepath)
+        self._lock = threading.Lock()
+        if append and self.filepath.exists():
+            reader = ContainerReader(self.filepath)
+            self.meta = {**reader.meta, **(meta or {})}
+            self.entries = reader.entries
+            end = reader.data_end
+            reader.close()
+            self._file = open(self.filepath, 'r+b')
+            self._file.seek(end)
+            # 舊索引在第一次寫入前才失效；沒有索引時截掉最後不完整的紀錄
+            self._index_live = reader.indexed
+            if not reader.indexed:
+                self._file.truncate(end)
+        else:
+            self.meta = meta or {}
+            self.entries = []
+            self._file = open(self.filepath, 'w+b')
+            self._write_header(0, 0)
+            self._file.seek(_align(HEADER.size))
+            self._index_live = False
+
+    def _write_header(self, index_offset, index_size):
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, 0, index_offset, index_size))
+
+    def _invalidate_index(self):
+        """
+        覆寫舊索引之前，先把檔頭的索引位置清為 0 並寫出，再截掉舊索引；
+        其他行程在兩次 flush 之間開啟檔案時會改以逐筆紀錄讀取，不會讀到半個索引
+        """
+        if not self._index_live:
+            return
+        end = self._file.tell()
+        self._write_header(0, 0)
+        self._file.flush()
+        self._file.truncate(end)
+        self._file.seek(end)
+        self._index_live = False
+
+    def append(self, img, **meta):
+        """附加一張影像與其 meta（例如檔名、運算串），回傳其索引"""
+        img = np.ascontiguousarray(img)
+        desc = json.dumps({'shape': img.shape, 'dtype': img.dtype.str, 'meta': meta}).encode()
+        with self._lock:
+            self._invalidate_index()
+            pos = self._file.tell()
+            offset = _align(pos + RECORD.size + len(desc))
+            self._file.write(RECORD.pack(REC_MAGIC, len(desc)) + desc)
+            self._file.seek(offset)
+            self._file.write(img.data)
+            self._file.seek(_align(offset + img.nbytes))
+            self.entries.append({'offset': offset, 'shape': list(img.shape),
+                                 'dtype': img.dtype.str, 'meta': meta})
+            return len(self.entries) - 1
+
+    def flush(self):
+        """寫出索引並更新檔頭，讓其他行程可以讀到目前已寫入的影像"""
+        with self._lock:
+            self._invalidate_index()
+            end = self._file.tell()
+            index = json.dumps({'meta': self.meta, 'entries': self.entries}).encode()
+            # 先寫索引、最後才更新檔頭，讀取端不會看到指向不完整索引的檔頭
+            self._file.write(index)
+            self._file.flush()
+            self._write_header(end, len(index))
+            self._file.flush()
+            self._file.seek(end)
+            self._index_live = True
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ContainerReader:
+    """
+    讀取容器檔：只載入索引，影像以 np.memmap 零複製存取；
+    取第 i 張（或依檔名 meta['name']）只會讀入該張的資料。
+    """
+
+    def __init__(self, filepath):
+        self.filepath = Path(filepath)
+        with open(self.filepath, 'rb') as f:
+            magic, version, _, index_offset, index_size = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{self.filepath} 不是影像容器檔")
+            if version > VERSION:
+                raise ValueError(f"不支援的容器版本: {version}")
+            self.indexed = bool(index_offset)
+            if index_offset:
+                f.seek(index_offset)
+                index = json.loads(f.read(index_size))
+                self.meta = index['meta']
+                self.entries = index['entries']
+                self.data_end = index_offset
+            else:
+                self.meta = {}
+                self.entries, self.data_end = self._scan(f)
+        self._names = {e['meta']['name']: i for i, e in enumerate(self.entries)
+                       if 'name' in e['meta']}
+        self._mmap = None
+
+    @staticmethod
+    def _scan(f):
+        """檔案寫入中或未正常關閉時，逐筆讀取紀錄描述重建索引"""
+        size = f.seek(0, 2)
+        pos = _align(HEADER.size)
+        entries = []
+        while pos + RECORD.size <= size:
+            f.seek(pos)
+            magic, length = RECORD.unpack(f.read(RECORD.size))
+            if magic != REC_MAGIC:
+                break
+            try:
+                desc = json.loads(f.read(length))
+            except ValueError:
+                break
+            offset = _align(pos + RECORD.size + length)
+            nbytes = int(np.prod(desc['shape'])) * np.dtype(desc['dtype']).itemsize
+            if offset + nbytes > size:
+                # 最後一筆沒寫完
+                break
+            entries.append({'offset': offset, 'shape': desc['shape'],
+                            'dtype': desc['dtype'], 'meta': desc['meta']})
+            pos = _align(offset + nbytes)
+        return entries, pos
+
+    @property
+    def mmap(self):
+        """整個檔案的位元組記憶體映射（延遲建立）"""
+        if self._mmap is None:
+            self._mmap = np.memmap(self.filepath, dtype=np.uint8, mode='r')
+        return self._mmap
+
+    def __getitem__(self, key):
+        """以索引或檔名取得影像的唯讀視圖"""
+        index = self._names[key] if isinstance(key, str) else key
+        entry = self.entries[index]
+        dtype = np.dtype(entry['dtype'])
+        nbytes = int(np.prod(entry['shape'])) * dtype.itemsize
+        buf = self.mmap[entry['offset']:entry['offset'] + nbytes]
+        return buf.view(dtype).reshape(entry['shape'])
+
+    def entry_meta(self, key):
+        """取得單張影像的 meta"""
+        index = self._names[key] if isinstance(key, str) else key
+        return self.entries[index]['meta']
+
+    def names(self):
+        return list(self._names)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        for index in range(len(self.entries)):
+            yield self[index]
+
+    def close(self):
+        """釋放記憶體映射"""
+        self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
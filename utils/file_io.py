@@ -1,13 +1,20 @@
 import numpy as np
-from PIL import Image
 from pathlib import Path
 import json
 
+from core.decode import decode_gray
+from core.raw_reader import RawImageReader
+from core.stats import image_stats
+from .container import ContainerReader, ContainerWriter
+
 class FileIO:
     @staticmethod
-    def read_raw(filepath, width=512, height=512, dtype=np.uint8):
-        """讀取RAW格式影像"""
+    def read_raw(filepath, width=512, height=512, dtype=np.uint8, offset=0, mmap=False):
+        """讀取RAW格式影像；mmap=True 時回傳記憶體映射的零複製視圖"""
+        if mmap:
+            return RawImageReader(filepath, width, height, dtype, offset).frame(0)
         with open(filepath, 'rb') as f:
+            f.seek(offset)
             raw_data = f.read()
         img = np.frombuffer(raw_data, dtype=dtype)
         img = img.reshape((height, width))
@@ -19,18 +26,32 @@ class FileIO:
         img.astype(np.uint8).tofile(filepath)
 
     @staticmethod
-    def read_image(filepath):
-        """讀取一般影像格式（JPG, BMP, PNG等）"""
-        img = Image.open(filepath)
-        if img.mode != 'L':
-            img = img.convert('L')
-        return np.array(img)
+    def read_image(filepath, target_size=None):
+        """讀取一般影像格式（JPG, BMP, PNG等）；target_size 時 JPEG 以縮小解碼讀入"""
+        return decode_gray(filepath, target_size)
 
     @staticmethod
     def write_image(img, filepath):
         """寫入一般影像格式"""
+        from PIL import Image
+
         Image.fromarray(img.astype(np.uint8)).save(filepath)
 
+    @staticmethod
+    def write_container(images, filepath, names=None, meta=None):
+        """將多張影像寫入單一容器檔，names 會存為每張影像的 meta['name']"""
+        with ContainerWriter(filepath, meta) as writer:
+            for i, img in enumerate(images):
+                if names is not None:
+                    writer.append(img, name=names[i])
+                else:
+                    writer.append(img)
+
+    @staticmethod
+    def open_container(filepath):
+        """開啟容器檔，影像以記憶體映射隨機存取"""
+        return ContainerReader(filepath)
+
     @staticmethod
     def save_config(config_dict, filepath):
         """儲存設定檔"""
@@ -45,7 +66,11 @@ class FileIO:
 
     @staticmethod
     def get_image_info(img):
-        """取得影像資訊"""
+        """取得影像資訊；uint8/uint16 影像以單次直方圖計算全部統計"""
+        if img.dtype in (np.uint8, np.uint16) and img.size:
+            info = {'shape': img.shape, 'dtype': str(img.dtype)}
+            info.update(image_stats(img).as_dict())
+            return info
         info = {
             'shape': img.shape,
             'dtype': str(img.dtype),
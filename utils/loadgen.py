@@ -0,0 +1,83 @@
+"""
+影像處理服務的負載產生器：
+
+    python -m utils.loadgen --input data/lena.raw --ops gamma:0.5 --concurrency 8 --requests 400
+"""
+import argparse
+import http.client
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlencode
+
+import numpy as np
+
+
+def run_load(host, port, body, query, concurrency=8, requests=200):
+    """以 concurrency 條持續連線送出請求，回傳各請求的延遲（秒）"""
+    path = '/process?' + urlencode(query)
+    per_worker = [requests // concurrency + (i < requests % concurrency)
+                  for i in range(concurrency)]
+
+    def worker(n):
+        conn = http.client.HTTPConnection(host, port)
+        latencies = []
+        try:
+            for _ in range(n):
+                start = time.perf_counter()
+                conn.request('POST', path, body)
+                response = conn.getresponse()
+                data = response.read()
+                if response.status != 200:
+                    raise RuntimeError(f"HTTP {response.status}: {data.decode(errors='replace')}")
+                latencies.append(time.perf_counter() - start)
+        finally:
+            conn.close()
+        return latencies
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(worker, per_worker))
+    return [t for latencies in results for t in latencies]
+
+
+def fetch_stats(host, port):
+    conn = http.client.HTTPConnection(host, port)
+    try:
+        conn.request('GET', '/stats')
+        return json.loads(conn.getresponse().read())
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='影像處理服務負載測試')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--input', default='data/lena.raw', help='上傳的 RAW/BMP 影像')
+    parser.add_argument('--width', type=int, default=512)
+    parser.add_argument('--height', type=int, default=512)
+    parser.add_argument('--ops', default='log', help='運算串')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    body = Path(args.input).read_bytes()
+    query = {'ops': args.ops, 'width': args.width, 'height': args.height}
+    start = time.perf_counter()
+    latencies = np.array(run_load(args.host, args.port, body, query,
+                                  args.concurrency, args.requests))
+    elapsed = time.perf_counter() - start
+
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) * 1000
+    print(f"請求數: {len(latencies)}, 並行數: {args.concurrency}, 總時間: {elapsed:.2f}s")
+    print(f"吞吐量: {len(latencies) / elapsed:.1f} 請求/s")
+    print(f"延遲 (用戶端): p50={p50:.2f}ms p90={p90:.2f}ms p99={p99:.2f}ms "
+          f"max={latencies.max() * 1000:.2f}ms")
+    batching = fetch_stats(args.host, args.port)['batching']
+    print(f"伺服器合併批次: {batching['batches']} 次, "
+          f"平均每批 {batching['mean_batch_size']:.2f} 張")
+
+
+if __name__ == '__main__':
+    main()
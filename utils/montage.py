@@ -0,0 +1,76 @@
+import numpy as np
+from pathlib import Path
+
+LABEL_HEIGHT = 16
+
+
+def _fit(img, cell_height, cell_width):
+    """以整數倍複製像素放大小影像（等同最近鄰），讓它盡量填滿格子"""
+    h, w = img.shape
+    factor = max(1, min(cell_height // h, cell_width // w))
+    if factor > 1:
+        img = np.repeat(np.repeat(img, factor, axis=0), factor, axis=1)
+    return img
+
+
+def _draw_labels(canvas, positions, titles):
+    """用 PIL 在畫布上寫標題；PIL 只在需要標題時才載入"""
+    from PIL import Image, ImageDraw, ImageFont
+
+    pil_img = Image.fromarray(canvas)
+    draw = ImageDraw.Draw(pil_img)
+    font = ImageFont.load_default()
+    for (y, x), title in zip(positions, titles):
+        try:
+            draw.text((x, y), title, fill=0, font=font)
+        except UnicodeEncodeError:
+            # 點陣預設字型只支援 Latin-1
+            draw.text((x, y), title.encode('latin-1', 'replace').decode('latin-1'),
+                      fill=0, font=font)
+    return np.asarray(pil_img)
+
+
+def make_montage(images, titles=None, cols=3, pad=8, background=255, fit=True):
+    """
+    將多張灰階影像排成一張 uint8 畫布（不經過 matplotlib）。
+    每格大小取最大的影像；fit=True 時小影像會以整數倍放大。
+    """
+    images = [np.asarray(img).astype(np.uint8, copy=False) for img in images]
+    n = len(images)
+    cols = max(1, min(cols, n))
+    rows = (n + cols - 1) // cols
+    cell_height = max(img.shape[0] for img in images)
+    cell_width = max(img.shape[1] for img in images)
+    label_height = LABEL_HEIGHT if titles else 0
+
+    canvas = np.full((rows * (cell_height + label_height + pad) + pad,
+                      cols * (cell_width + pad) + pad), background, dtype=np.uint8)
+
+    positions = []
+    for i, img in enumerate(images):
+        if fit:
+            img = _fit(img, cell_height, cell_width)
+        row, col = divmod(i, cols)
+        top = pad + row * (cell_height + label_height + pad)
+        left = pad + col * (cell_width + pad)
+        positions.append((top, left))
+
+        # 影像置中於格子內、標題列下方
+        y = top + label_height + (cell_height - img.shape[0]) // 2
+        x = left + (cell_width - img.shape[1]) // 2
+        canvas[y:y + img.shape[0], x:x + img.shape[1]] = img
+
+    if titles:
+        canvas = _draw_labels(canvas, positions, titles)
+    return canvas
+
+
+def save_montage(canvas, filepath):
+    """儲存畫布；.raw 直接寫出位元組，其他格式交給 PIL"""
+    filepath = Path(filepath)
+    if filepath.suffix.lower() == '.raw':
+        canvas.tofile(filepath)
+    else:
+        from PIL import Image
+        Image.fromarray(canvas).save(filepath)
+    return filepath
@@ -0,0 +1,144 @@
+import atexit
+import functools
+import inspect
+import json
+import os
+import time
+from collections import defaultdict
+
+import numpy as np
+
+# 設定此環境變數（值為輸出 JSON 路徑，或 1 使用預設路徑）即可在啟動時開啟量測
+PROFILE_ENV = 'MMIP_PROFILE'
+DEFAULT_OUTPUT = 'profile.json'
+
+# 耗時直方圖的區間上界（秒）
+TIME_BUCKETS = (1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0, 10.0, float('inf'))
+
+
+def _nbytes(value):
+    """估計參數/回傳值的資料量（位元組）"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, (list, tuple)):
+        return sum(_nbytes(v) for v in value)
+    if isinstance(value, dict):
+        return sum(_nbytes(v) for v in value.values())
+    return 0
+
+
+def _allocated(result, inputs):
+    """回傳值中新配置（不與輸入共用記憶體）的陣列大小"""
+    if not isinstance(result, np.ndarray):
+        return 0
+    for arg in inputs:
+        if isinstance(arg, np.ndarray) and np.shares_memory(result, arg):
+            return 0
+    # 記憶體映射的視圖不佔用新記憶體
+    if isinstance(result, np.memmap) or result.base is not None and isinstance(result.base, np.memmap):
+        return 0
+    return result.nbytes
+
+
+class Profiler:
+    """彙總每個方法的呼叫次數、耗時、輸入/輸出位元組與配置量"""
+
+    def __init__(self):
+        self.stats = defaultdict(lambda: {
+            'calls': 0,
+            'total_s': 0.0,
+            'max_s': 0.0,
+            'bytes_in': 0,
+            'bytes_out': 0,
+            'alloc_bytes': 0,
+            'histogram': [0] * len(TIME_BUCKETS)
+        })
+
+    def record(self, name, elapsed, bytes_in, bytes_out, alloc):
+        entry = self.stats[name]
+        entry['calls'] += 1
+        entry['total_s'] += elapsed
+        entry['max_s'] = max(entry['max_s'], elapsed)
+        entry['bytes_in'] += bytes_in
+        entry['bytes_out'] += bytes_out
+        entry['alloc_bytes'] += alloc
+        for i, bound in enumerate(TIME_BUCKETS):
+            if elapsed <= bound:
+                entry['histogram'][i] += 1
+                break
+
+    def report(self):
+        """取得彙總結果"""
+        report = {}
+        for name, entry in sorted(self.stats.items()):
+            report[name] = dict(entry)
+            report[name]['mean_s'] = entry['total_s'] / entry['calls']
+        return {'time_buckets_s': [str(b) for b in TIME_BUCKETS], 'methods': report}
+
+    def dump(self, filepath):
+        """將彙總結果寫成 JSON"""
+        with open(filepath, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+
+
+_profiler = None
+
+
+def _wrap(name, func, profiler):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        inputs = args + tuple(kwargs.values())
+        profiler.record(name, elapsed, _nbytes(inputs), _nbytes(result),
+                        _allocated(result, inputs))
+        return result
+    wrapper.__profiled__ = True
+    return wrapper
+
+
+def instrument(cls, profiler):
+    """替類別的所有公開方法加上量測包裝（只在開啟量測時呼叫，關閉時零成本）"""
+    for attr, value in list(vars(cls).items()):
+        if attr.startswith('_'):
+            continue
+        name = f"{cls.__name__}.{attr}"
+        if isinstance(value, staticmethod):
+            func = value.__func__
+            if not getattr(func, '__profiled__', False):
+                setattr(cls, attr, staticmethod(_wrap(name, func, profiler)))
+        elif isinstance(value, classmethod):
+            func = value.__func__
+            if not getattr(func, '__profiled__', False):
+                setattr(cls, attr, classmethod(_wrap(name, func, profiler)))
+        elif inspect.isfunction(value) and not getattr(value, '__profiled__', False):
+            setattr(cls, attr, _wrap(name, value, profiler))
+    return cls
+
+
+def enable(output=DEFAULT_OUTPUT):
+    """開啟量測：包裝 ImageProcessor、FileIO、Visualizer，並在結束時輸出 JSON"""
+    global _profiler
+    if _profiler is not None:
+        return _profiler
+
+    from core import ImageProcessor
+    from .file_io import FileIO
+    from .visualization import Visualizer
+
+    _profiler = Profiler()
+    for cls in (ImageProcessor, FileIO, Visualizer):
+        instrument(cls, _profiler)
+    atexit.register(_profiler.dump, output)
+    return _profiler
+
+
+def enable_from_env():
+    """若設定了 MMIP_PROFILE 環境變數則開啟量測"""
+    value = os.environ.get(PROFILE_ENV)
+    if not value or value == '0':
+        return None
+    return enable(DEFAULT_OUTPUT if value == '1' else value)
@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+
+def _temp_file(path, mode):
+    """在目標所在資料夾建立唯一的暫存檔；同一行程的多個執行緒同時寫同一鍵也不會互相覆蓋"""
+    return tempfile.NamedTemporaryFile(mode, dir=path.parent, prefix=path.name + '.',
+                                       suffix='.tmp', delete=False)
+
+
+def _replace(tmp, path):
+    """
+    暫存檔換名為目標檔。內容定址的值相同，換名失敗（例如資料夾被其他寫入者
+    清掉）時視為已由其他寫入者完成，刪除暫存檔並回傳 False
+    """
+    try:
+        os.replace(tmp, path)
+        return True
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        return False
+
+
+class ResultCache:
+    """
+    以內容定址的磁碟結果快取：鍵為輸入檔位元組、運算串與參數的雜湊，
+    值以 .npy 儲存。總大小超過上限時依最近使用時間 (LRU) 淘汰。
+    多個行程共用同一資料夾時，各行程只知道自己寫入的量，因此每寫入
+    RESCAN_EVERY 次會重新掃描資料夾；上限可能暫時超出最多約
+    (行程數 x RESCAN_EVERY) 筆項目。
+    """
+
+    RESCAN_EVERY = 32
+
+    def __init__(self, cache_dir, max_bytes=1 << 30):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        (self.cache_dir / 'stat').mkdir(exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._total_bytes = None
+        self._puts = 0
+
+    def file_digest(self, filepath):
+        """
+        輸入檔內容的 SHA-256。以 (大小, 修改時間) 記住每個路徑上次的雜湊，
+        未變更的檔案不必重新讀取；每個路徑一個小檔，多個行程同時使用也安全。
+        """
+        filepath = Path(filepath).resolve()
+        st = filepath.stat()
+        stamp = [st.st_size, st.st_mtime_ns]
+        memo = self.cache_dir / 'stat' / (hashlib.sha1(str(filepath).encode()).hexdigest() + '.json')
+        try:
+            with open(memo) as f:
+                entry = json.load(f)
+            if entry[:2] == stamp:
+                return entry[2]
+        except (OSError, ValueError):
+            pass
+
+        digest = hashlib.sha256()
+        with open(filepath, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        with _temp_file(memo, 'w') as f:
+            json.dump(stamp + [digest.hexdigest()], f)
+        _replace(f.name, memo)
+        return digest.hexdigest()
+
+    @staticmethod
+    def make_key(input_digest, ops, **params):
+        """由輸入雜湊、運算串與參數（gamma、大小、方法等）組成快取鍵"""
+        payload = json.dumps({'input': input_digest, 'ops': ops, 'params': params},
+                             sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key):
+        return self.cache_dir / key[:2] / f"{key}.npy"
+
+    def get(self, key):
+        """取得快取結果；未命中回傳 None"""
+        path = self._path(key)
+        try:
+            result = np.load(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        # 更新修改時間作為 LRU 的最近使用時間
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return result
+
+    def put(self, key, array):
+        """寫入結果（先寫暫存檔再換名，避免讀到寫一半的檔案）"""
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        with _temp_file(path, 'wb') as f:
+            np.save(f, np.ascontiguousarray(array))
+        try:
+            old_size = path.stat().st_size
+        except OSError:
+            old_size = 0
+        if not _replace(f.name, path):
+            return
+        self._puts += 1
+        if self._puts % self.RESCAN_EVERY == 0:
+            # 重新掃描以納入其他行程的寫入與淘汰
+            self._total_bytes = None
+        try:
+            self._add_bytes(path.stat().st_size - old_size)
+        except OSError:
+            # 剛寫入的項目已被其他行程淘汰
+            return
+        self.evict()
+
+    def get_or_compute(self, key, compute):
+        """命中時直接回傳，否則呼叫 compute() 並存入快取"""
+        result = self.get(key)
+        if result is None:
+            result = compute()
+            self.put(key, result)
+        return result
+
+    def _entries(self):
+        return list(self.cache_dir.glob('[0-9a-f][0-9a-f]/*.npy'))
+
+    def _add_bytes(self, delta):
+        if self._total_bytes is None:
+            self._total_bytes = sum(p.stat().st_size for p in self._entries())
+        else:
+            self._total_bytes += delta
+
+    @property
+    def total_bytes(self):
+        if self._total_bytes is None:
+            self._add_bytes(0)
+        return self._total_bytes
+
+    def evict(self):
+        """總大小超過上限時，刪除最久未使用的項目"""
+        if self.total_bytes <= self.max_bytes:
+            return
+        entries = []
+        for path in self._entries():
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                total -= size
+            except OSError:
+                pass
+        self._total_bytes = total
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses,
+                'total_bytes': self.total_bytes, 'max_bytes': self.max_bytes}
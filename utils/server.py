@@ -0,0 +1,270 @@
+import io
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from core import ImageProcessor, PointPipeline
+from core.decode import decode_gray
+
+# BMP/PNG/JPEG 以檔頭判斷，其餘視為 RAW
+IMAGE_SIGNATURES = (b'BM', b'\x89PNG', b'\xff\xd8')
+
+# 依運算串保存的管線與延遲統計數量上限；運算串由用戶端提供，超過時淘汰最久未用的
+MAX_TRACKED_OPS = 64
+
+
+class LatencyStats:
+    """保留最近的延遲樣本，計算百分位數"""
+
+    def __init__(self, maxlen=10000):
+        self._samples = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def add(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+
+    def as_dict(self):
+        with self._lock:
+            samples = np.array(self._samples)
+        if not len(samples):
+            return {'count': self.count}
+        p50, p90, p99 = np.percentile(samples, [50, 90, 99]) * 1000
+        return {'count': self.count, 'p50_ms': p50, 'p90_ms': p90, 'p99_ms': p99,
+                'max_ms': samples.max() * 1000}
+
+
+class _Batch:
+    def __init__(self):
+        self.slots = []
+        self.full = threading.Event()
+
+
+class _Slot:
+    def __init__(self, img):
+        self.img = img
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class RequestBatcher:
+    """
+    將同時到達、運算串與影像大小相同的請求合併成一次 (N, H, W) 堆疊運算。
+    第一個請求成為 leader，等待 window 秒（或湊滿 max_batch）後一起處理，
+    其餘請求只需等待結果。
+    """
+
+    def __init__(self, processor, window=0.002, max_batch=32):
+        self.processor = processor
+        self.window = window
+        self.max_batch = max_batch
+        self.batches = 0
+        self.batched_items = 0
+        self._pending = {}
+        self._pipelines = OrderedDict()
+        self._lock = threading.Lock()
+
+    def pipeline(self, ops):
+        """依正規化後的運算串 (PointPipeline.spec) 快取管線，最多保留 MAX_TRACKED_OPS 個"""
+        pipeline = PointPipeline.from_spec(self.processor, ops)
+        key = pipeline.spec
+        with self._lock:
+            cached = self._pipelines.get(key)
+            if cached is not None:
+                self._pipelines.move_to_end(key)
+                return cached
+            self._pipelines[key] = pipeline
+            while len(self._pipelines) > MAX_TRACKED_OPS:
+                self._pipelines.popitem(last=False)
+        return pipeline
+
+    def submit(self, ops, img):
+        """處理一張影像；可能與其他請求合併執行"""
+        pipeline = self.pipeline(ops)
+        key = (pipeline.spec, img.shape, img.dtype.str)
+        slot = _Slot(img)
+        with self._lock:
+            batch = self._pending.get(key)
+            leader = batch is None
+            if leader:
+                batch = self._pending[key] = _Batch()
+            batch.slots.append(slot)
+            if len(batch.slots) >= self.max_batch:
+                # 已湊滿，之後的請求另起一批
+                del self._pending[key]
+                batch.full.set()
+
+        if not leader:
+            slot.done.wait()
+        else:
+            batch.full.wait(self.window)
+            with self._lock:
+                if self._pending.get(key) is batch:
+                    del self._pending[key]
+            self._run(pipeline, batch.slots)
+
+        if slot.error is not None:
+            raise slot.error
+        return slot.result
+
+    def _run(self, pipeline, slots):
+        try:
+            if len(slots) == 1:
+                slots[0].result = pipeline.apply(slots[0].img)
+            else:
+                results = pipeline.apply(np.stack([s.img for s in slots]))
+                for slot, result in zip(slots, results):
+                    slot.result = result
+        except Exception as e:
+            for slot in slots:
+                slot.error = e
+        with self._lock:
+            self.batches += 1
+            self.batched_items += len(slots)
+        for slot in slots:
+            slot.done.set()
+
+    def stats(self):
+        return {'batches': self.batches, 'items': self.batched_items,
+                'mean_batch_size': self.batched_items / self.batches if self.batches else 0.0,
+                'window_ms': self.window * 1000, 'max_batch': self.max_batch}
+
+
+def decode_upload(body, width=512, height=512):
+    """解碼上傳內容：BMP/PNG/JPEG 轉灰階，其餘依寬高解讀為 uint8 RAW"""
+    if body.startswith(IMAGE_SIGNATURES):
+        return decode_gray(io.BytesIO(body)), 'png'
+    if len(body) != width * height:
+        raise ValueError(f"RAW 資料長度 {len(body)} 與 {width}x{height} 不符")
+    return np.frombuffer(body, dtype=np.uint8).reshape((height, width)), 'raw'
+
+
+def encode_result(img, fmt):
+    """RAW 輸入回傳 RAW 位元組，其他格式回傳 PNG"""
+    if fmt == 'raw':
+        return img.astype(np.uint8, copy=False).tobytes(), 'application/octet-stream'
+    from PIL import Image
+
+    buf = io.BytesIO()
+    Image.fromarray(img.astype(np.uint8, copy=False)).save(buf, format='PNG')
+    return buf.getvalue(), 'image/png'
+
+
+class ProcessingHandler(BaseHTTPRequestHandler):
+    """
+    POST /process?ops=gamma:0.5,resize:128x128&width=512&height=512
+        本文為 RAW/BMP/PNG 影像，回傳處理後的影像（X-Width/X-Height 標頭為輸出大小）
+    GET  /stats
+        延遲百分位數、合併批次與重取樣計畫快取統計
+    """
+
+    protocol_version = 'HTTP/1.1'
+    # 持續連線下標頭與本文分兩次寫出，Nagle 演算法會讓小回應等到對方延遲 ACK 才送出
+    disable_nagle_algorithm = True
+
+    def _send(self, status, body, content_type='application/json', headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, str(value))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status, obj):
+        self._send(status, json.dumps(obj, ensure_ascii=False, indent=2).encode())
+
+    def do_GET(self):
+        if urlparse(self.path).path != '/stats':
+            self._send_json(404, {'error': f"找不到路徑: {self.path}"})
+            return
+        self._send_json(200, self.server.stats())
+
+    def do_POST(self):
+        start = time.perf_counter()
+        url = urlparse(self.path)
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if url.path != '/process':
+            self._send_json(404, {'error': f"找不到路徑: {self.path}"})
+            return
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            # 統計以正規化後的運算串為鍵，寫法不同但相同的運算串合併計算
+            ops = self.server.batcher.pipeline(query.get('ops', '')).spec
+            img, fmt = decode_upload(body, int(query.get('width', 512)),
+                                     int(query.get('height', 512)))
+            result = self.server.batcher.submit(ops, img)
+        except (ValueError, OSError) as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        data, content_type = encode_result(result, query.get('format', fmt))
+        self._send(200, data, content_type,
+                   {'X-Width': result.shape[1], 'X-Height': result.shape[0]})
+        self.server.record(ops, time.perf_counter() - start)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class ProcessingServer(ThreadingHTTPServer):
+    """常駐的影像處理服務：ImageProcessor、LUT 與重取樣計畫在請求之間保持載入狀態"""
+
+    daemon_threads = True
+
+    def __init__(self, address=('127.0.0.1', 8000), processor=None, window=0.002,
+                 max_batch=32, verbose=False):
+        super().__init__(address, ProcessingHandler)
+        self.processor = processor or ImageProcessor()
+        self.batcher = RequestBatcher(self.processor, window, max_batch)
+        self.verbose = verbose
+        self.latency = LatencyStats()
+        self.latency_by_ops = OrderedDict()
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def record(self, ops, seconds):
+        self.latency.add(seconds)
+        with self._lock:
+            stats = self.latency_by_ops.get(ops)
+            if stats is None:
+                stats = self.latency_by_ops[ops] = LatencyStats()
+                while len(self.latency_by_ops) > MAX_TRACKED_OPS:
+                    self.latency_by_ops.popitem(last=False)
+            else:
+                self.latency_by_ops.move_to_end(ops)
+        stats.add(seconds)
+
+    def stats(self):
+        with self._lock:
+            by_ops = list(self.latency_by_ops.items())
+        return {
+            'uptime_s': time.time() - self.started,
+            'latency': self.latency.as_dict(),
+            'latency_by_ops': {ops: s.as_dict() for ops, s in by_ops},
+            'batching': self.batcher.stats(),
+            'plan_cache': self.processor.plan_cache.stats()
+        }
+
+
+def serve(host='127.0.0.1', port=8000, threads=1, window=0.002, max_batch=32, verbose=False):
+    """啟動服務直到 Ctrl+C"""
+    server = ProcessingServer((host, port), ImageProcessor(threads=threads), window,
+                              max_batch, verbose)
+    print(f"影像處理服務: http://{host}:{server.server_address[1]}/process?ops=... "
+          f"(統計: /stats)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.processor.executor.shutdown()
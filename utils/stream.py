@@ -0,0 +1,121 @@
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from core import ImageProcessor, PointPipeline, RawImageReader
+from core.decode import decode_gray
+
+FRAME_SUFFIXES = ('.bmp', '.png', '.jpg', '.jpeg', '.tif', '.tiff')
+
+
+def read_raw_stream(stream, width=512, height=512):
+    """
+    從二進位串流（例如 stdin）逐張讀取串接的 uint8 RAW 影格。
+    每張都讀入同一個預先配置的緩衝，產生的陣列在下一張讀入前有效。
+    """
+    buf = bytearray(width * height)
+    view = memoryview(buf)
+    frame = np.frombuffer(buf, dtype=np.uint8).reshape((height, width))
+    while True:
+        filled = 0
+        while filled < len(buf):
+            n = stream.readinto(view[filled:])
+            if not n:
+                break
+            filled += n
+        if filled == 0:
+            return
+        if filled < len(buf):
+            raise ValueError(f"最後一張影格不完整: {filled}/{len(buf)} bytes")
+        yield frame
+
+
+def iter_frames(source, width=512, height=512):
+    """依來源逐張產生影格：'-' 為 stdin 的 RAW 串流、資料夾為依檔名排序的影像、其餘為多張 RAW 檔"""
+    if source == '-':
+        yield from read_raw_stream(sys.stdin.buffer, width, height)
+        return
+    path = Path(source)
+    if path.is_dir():
+        for frame_path in sorted(p for p in path.iterdir()
+                                 if p.suffix.lower() in FRAME_SUFFIXES):
+            yield decode_gray(frame_path)
+        return
+    with RawImageReader(path, width, height) as reader:
+        yield from reader.iter_frames()
+
+
+class FrameStreamer:
+    """
+    逐張套用運算串。輸出、點運算結果與 nearest/bilinear 縮放的 gather/累加暫存
+    只在影格大小改變時配置一次；查表每次使用固定大小 (lut.CHUNK_PIXELS) 的索引暫存，
+    其他縮放方法的中間結果仍每張配置。
+    """
+
+    def __init__(self, processor, ops):
+        self.pipeline = PointPipeline.from_spec(processor, ops)
+        self.buffers = {}
+        self.out = None
+
+    def process(self, frame):
+        """處理一張影格，回傳（重複使用的）輸出陣列"""
+        shape = self.pipeline.output_shape(frame.shape)
+        if self.out is None or self.out.shape != shape:
+            self.out = np.empty(shape, dtype=np.uint8)
+        return self.pipeline.apply(frame, out=self.out, buffers=self.buffers)
+
+
+def run_stream(source, ops, output=None, width=512, height=512, threads=1):
+    """
+    串流處理影格序列並寫到 output（'-' 為 stdout，None 不輸出）。
+    回傳影格數、持續 fps 與每張延遲（讀取+處理+寫出）的統計。
+    """
+    streamer = FrameStreamer(ImageProcessor(threads=threads), ops)
+    if output == '-':
+        sink = sys.stdout.buffer
+    elif output is not None:
+        sink = open(output, 'wb')
+    else:
+        sink = None
+
+    latencies = []
+    frames = iter_frames(source, width, height)
+    start = time.perf_counter()
+    try:
+        t0 = start
+        for frame in frames:
+            out = streamer.process(frame)
+            if sink is not None:
+                sink.write(out.data)
+            t1 = time.perf_counter()
+            latencies.append(t1 - t0)
+            t0 = t1
+        if sink is not None:
+            sink.flush()
+    finally:
+        if sink is not None and output != '-':
+            sink.close()
+    elapsed = time.perf_counter() - start
+
+    stats = {'frames': len(latencies), 'elapsed_s': elapsed,
+             'fps': len(latencies) / elapsed if elapsed else 0.0}
+    if latencies:
+        ms = np.array(latencies) * 1000
+        p50, p99 = np.percentile(ms, [50, 99])
+        stats.update({'mean_ms': ms.mean(), 'p50_ms': p50, 'p99_ms': p99, 'max_ms': ms.max(),
+                      # 延遲抖動：每張延遲的標準差
+                      'jitter_ms': ms.std()})
+    return stats
+
+
+def print_stream_summary(stats, file=sys.stdout):
+    """輸出串流處理的 fps 與延遲抖動"""
+    print("-" * 30, file=file)
+    print(f"影格數: {stats['frames']}, 總時間: {stats['elapsed_s']:.2f}s, "
+          f"持續 {stats['fps']:.1f} fps", file=file)
+    if stats['frames']:
+        print(f"每張延遲: 平均 {stats['mean_ms']:.2f}ms  p50 {stats['p50_ms']:.2f}ms  "
+              f"p99 {stats['p99_ms']:.2f}ms  最大 {stats['max_ms']:.2f}ms  "
+              f"抖動 (標準差) {stats['jitter_ms']:.2f}ms", file=file)
@@ -0,0 +1,206 @@
+import hashlib
+import json
+import os
+import time
+import types
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import numpy as np
+
+
+def _code_digest(code, digest):
+    """函式位元碼與常數的雜湊（巢狀函式遞迴處理，不受行號影響）"""
+    digest.update(code.co_code)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _code_digest(const, digest)
+        else:
+            digest.update(repr(const).encode())
+    digest.update(repr(code.co_names).encode())
+
+
+class Task:
+    """
+    工作節點：func(*相依節點結果, **params)。
+    inputs 為讀取的檔案、outputs 為產生的檔案；回傳 ndarray 時結果會存檔供下游使用。
+    """
+
+    def __init__(self, name, func, deps=(), params=None, inputs=(), outputs=()):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.params = params or {}
+        self.inputs = tuple(Path(p) for p in inputs)
+        self.outputs = tuple(Path(p) for p in outputs)
+
+    def fingerprint(self, dep_fingerprints):
+        """由程式碼、參數、輸入檔 (大小, 修改時間) 與上游指紋組成"""
+        digest = hashlib.sha256()
+        func = getattr(self.func, '__func__', self.func)
+        digest.update(func.__qualname__.encode())
+        _code_digest(func.__code__, digest)
+        digest.update(json.dumps(self.params, sort_keys=True, default=str).encode())
+        for path in self.inputs:
+            st = path.stat()
+            digest.update(f"{path}:{st.st_size}:{st.st_mtime_ns}".encode())
+        for fp in dep_fingerprints:
+            digest.update(fp.encode())
+        return digest.hexdigest()
+
+
+class TaskGraph:
+    """
+    宣告式工作圖：記錄每個節點上次執行的指紋，只重新執行指紋改變（或輸出檔
+    遺失）的節點及其下游；彼此獨立的節點交給行程池平行執行。
+    """
+
+    def __init__(self, state_dir):
+        self.state_dir = Path(state_dir)
+        self.tasks = {}
+
+    def add(self, name, func, deps=(), params=None, inputs=(), outputs=()):
+        """加入節點，回傳節點名稱方便作為下游的 deps"""
+        if name in self.tasks:
+            raise ValueError(f"重複的工作名稱: {name}")
+        self.tasks[name] = Task(name, func, deps, params, inputs, outputs)
+        return name
+
+    def _order(self):
+        """拓撲排序，同時檢查相依節點是否存在與是否有循環"""
+        order, state = [], {}
+
+        def visit(name, path):
+            if state.get(name) == 'done':
+                return
+            if state.get(name) == 'visiting':
+                raise ValueError(f"工作圖有循環: {' -> '.join(path + [name])}")
+            if name not in self.tasks:
+                raise ValueError(f"{path[-1]} 相依的工作不存在: {name}")
+            state[name] = 'visiting'
+            for dep in self.tasks[name].deps:
+                visit(dep, path + [name])
+            state[name] = 'done'
+            order.append(name)
+
+        for name in self.tasks:
+            visit(name, [])
+        return order
+
+    def _value_path(self, name):
+        return self.state_dir / (hashlib.sha1(name.encode()).hexdigest()[:16] + '.npy')
+
+    def _load_state(self):
+        try:
+            with open(self.state_dir / 'state.json') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self, state):
+        tmp = self.state_dir / 'state.json.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp, self.state_dir / 'state.json')
+
+    def plan(self, force=False):
+        """計算每個節點的指紋，回傳 (拓撲順序, 指紋, 需要重跑的節點集合)"""
+        order = self._order()
+        state = self._load_state()
+        fingerprints, stale = {}, set()
+        for name in order:
+            task = self.tasks[name]
+            fingerprints[name] = task.fingerprint([fingerprints[d] for d in task.deps])
+            record = state.get(name)
+            if (force or record is None or record['fingerprint'] != fingerprints[name]
+                    or not all(p.exists() for p in task.outputs)
+                    or (record.get('value') and not self._value_path(name).exists())):
+                stale.add(name)
+
+        # 下游要重跑而上游的結果檔不見時，上游也要重跑（反向拓撲順序一路往上）
+        for name in reversed(order):
+            if name not in stale:
+                continue
+            for dep in self.tasks[name].deps:
+                if dep not in stale and not self._value_path(dep).exists():
+                    stale.add(dep)
+        return order, fingerprints, stale
+
+    def run(self, workers=None, force=False):
+        """執行工作圖，回傳每個節點的 {'name', 'status', 'elapsed'}"""
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        order, fingerprints, stale = self.plan(force)
+        state = self._load_state()
+        # 已從工作圖移除的節點（例如改掉的 gamma 值）不再保留
+        for name in [n for n in state if n not in self.tasks]:
+            del state[name]
+            self._value_path(name).unlink(missing_ok=True)
+        values, elapsed = {}, {}
+
+        def value(name):
+            if name not in values:
+                values[name] = np.load(self._value_path(name))
+            return values[name]
+
+        def finish(name, result, seconds):
+            has_value = isinstance(result, np.ndarray)
+            if has_value:
+                np.save(self._value_path(name), result)
+                values[name] = result
+            state[name] = {'fingerprint': fingerprints[name], 'value': has_value}
+            elapsed[name] = seconds
+
+        pending = [name for name in order if name in stale]
+        workers = workers or os.cpu_count() or 1
+        try:
+            if workers == 1:
+                for name in pending:
+                    task = self.tasks[name]
+                    finish(name, *_run_task(task.func, [value(d) for d in task.deps],
+                                            task.params))
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    running = {}
+                    while pending or running:
+                        # 上游都已完成的節點立即送出
+                        for name in [n for n in pending
+                                     if not any(d in stale and d not in elapsed
+                                                for d in self.tasks[n].deps)]:
+                            task = self.tasks[name]
+                            pending.remove(name)
+                            future = pool.submit(_run_task, task.func,
+                                                 [value(d) for d in task.deps], task.params)
+                            running[future] = name
+                        done, _ = wait(running, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            finish(running.pop(future), *future.result())
+        finally:
+            # 執行失敗時，已完成的節點下次仍可略過
+            self._save_state(state)
+
+        return [{'name': name,
+                 'status': 'recomputed' if name in stale else 'skipped',
+                 'elapsed': elapsed.get(name, 0.0)} for name in order]
+
+    def result(self, name):
+        """取得節點的 ndarray 結果（本次重新計算或先前存檔的結果）"""
+        return np.load(self._value_path(name))
+
+
+def _run_task(func, args, params):
+    """在工作行程中執行節點，回傳 (結果, 耗時)"""
+    start = time.perf_counter()
+    result = func(*args, **params)
+    return result, time.perf_counter() - start
+
+
+def print_report(report):
+    """輸出每個節點是略過或重新計算，以及總計"""
+    print("-" * 30)
+    for entry in report:
+        if entry['status'] == 'recomputed':
+            print(f"  [重新計算] {entry['name']:<40s} {entry['elapsed'] * 1000:8.1f}ms")
+        else:
+            print(f"  [略過]     {entry['name']}")
+    recomputed = sum(e['status'] == 'recomputed' for e in report)
+    print(f"重新計算 {recomputed} 個工作，略過 {len(report) - recomputed} 個")
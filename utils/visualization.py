@@ -1,7 +1,15 @@
-import matplotlib.pyplot as plt
 from pathlib import Path
 import numpy as np
 
+from core.stats import image_stats
+from .montage import make_montage, save_montage
+
+
+def _pyplot():
+    """matplotlib 只在真的要畫圖時才載入"""
+    import matplotlib.pyplot as plt
+    return plt
+
 class Visualizer:
     def __init__(self, output_dir="output"):
         self.output_dir = Path(output_dir)
@@ -9,6 +17,7 @@ class Visualizer:
 
     def display_images(self, images, titles, figsize=(15, 10)):
         """顯示多張影像"""
+        plt = _pyplot()
         n = len(images)
         cols = 3
         rows = (n + cols - 1) // cols
@@ -38,20 +47,32 @@ class Visualizer:
         plt.tight_layout()
         return fig
 
+    def save_montage(self, images, titles, filename, cols=3):
+        """不經過 matplotlib，直接將影像拼成一張圖存檔"""
+        canvas = make_montage(images, titles, cols=cols)
+        return save_montage(canvas, self.output_dir / filename)
+
     def save_figure(self, fig, filename):
         """儲存圖片"""
+        plt = _pyplot()
         fig.savefig(self.output_dir / filename, dpi=100, bbox_inches='tight')
         plt.close(fig)
 
     def plot_histogram(self, img, title="Histogram"):
         """繪製直方圖"""
+        plt = _pyplot()
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 4))
 
         ax1.imshow(img, cmap='gray')
         ax1.set_title("Image")
         ax1.axis('off')
 
-        ax2.hist(img.ravel(), bins=256, range=[0, 256], color='black', alpha=0.7)
+        if img.dtype == np.uint8:
+            # 直接用單次 bincount 的計數繪製，不必讓 matplotlib 重新分箱
+            ax2.bar(np.arange(256), image_stats(img).histogram, width=1.0,
+                    color='black', alpha=0.7)
+        else:
+            ax2.hist(img.ravel(), bins=256, range=[0, 256], color='black', alpha=0.7)
         ax2.set_title(title)
         ax2.set_xlabel("Pixel Value")
         ax2.set_ylabel("Frequency")
@@ -62,6 +83,7 @@ class Visualizer:
 
     def compare_images(self, img1, img2, title1="Original", title2="Processed"):
         """比較兩張影像"""
+        plt = _pyplot()
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
 
         ax1.imshow(img1, cmap='gray')